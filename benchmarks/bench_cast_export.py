@@ -0,0 +1,75 @@
+"""Size and speed benchmark for the asciicast export.
+
+Compares the delta-encoded .cast recording against the text export (the
+frame archive) for the same converted frames. Without arguments it uses the
+reproducible synthetic clips from bench_html_export; pass video files to
+benchmark real footage instead:
+
+    python benchmarks/bench_cast_export.py [--width 120] [video ...]
+
+Conversion is done once per clip and is not part of the timings, which cover
+only writing each export.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_html_export import FPS, convert, synthetic_clips, video_clip  # noqa: E402
+from yt2ascii.exporter import AsciicastWriter, export_to_text  # noqa: E402
+
+
+def timed_text(frames, path):
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            start = time.perf_counter()
+            export_to_text(frames, path, FPS)
+            return time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+
+
+def timed_cast(frames, path):
+    # the writer directly rather than export_to_asciicast, for the event count
+    start = time.perf_counter()
+    with AsciicastWriter(path, FPS) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return time.perf_counter() - start, writer.events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--width", type=int, default=120)
+    args = parser.parse_args()
+
+    clips = [video_clip(p) for p in args.videos] if args.videos else synthetic_clips()
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"{'clip':<32} {'frames':>6} {'events':>6} {'text bytes':>12} {'cast bytes':>12} {'ratio':>7} "
+              f"{'text time':>9} {'cast time':>9}")
+        for name, frames in clips:
+            ascii_frames = convert(frames, args.width)
+
+            text_path = os.path.join(tmp, "out.txt")
+            text_t = timed_text(ascii_frames, text_path)
+            text_size = os.path.getsize(text_path)
+
+            cast_path = os.path.join(tmp, "out.cast")
+            cast_t, events = timed_cast(ascii_frames, cast_path)
+            cast_size = os.path.getsize(cast_path)
+
+            print(f"{name:<32} {len(frames):>6} {events:>6} {text_size:>12,} {cast_size:>12,} "
+                  f"{text_size / cast_size:>6.1f}x {text_t * 1000:>7.1f}ms {cast_t * 1000:>7.1f}ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Size and page-load benchmark for the HTML export.
+
+Compares the packed HTML player against the old format (every frame embedded
+as a JSON string of raw ANSI). Without arguments it renders reproducible
+synthetic clips; pass video files to benchmark real footage instead:
+
+    python benchmarks/bench_html_export.py [--width 120] [video ...]
+
+Load time is measured by running the page script under node (same V8 engine
+as Chrome/Edge) with a stub DOM, when node is on PATH.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from yt2ascii.ascii_converter import FrameConverter  # noqa: E402
+from yt2ascii.exporter import export_to_html  # noqa: E402
+
+FPS = 24
+
+# runs the page script with a stub DOM and reports when the first frame is
+# on screen and what decoding + rendering every frame costs
+_NODE_NEW = r"""
+const fs = require('fs');
+const html = fs.readFileSync(process.argv[1], 'utf8');
+const js = html.split('<script>')[1].split('</script>')[0];
+let rendered = 0;
+global.document = {getElementById: () => ({set innerHTML(v) { rendered++; }})};
+global.setInterval = () => 1; global.clearInterval = () => {};
+const t0 = performance.now();
+eval(js + `;
+(async () => {
+    while (!data) await new Promise(r => setTimeout(r, 0));
+    const first = performance.now() - t0;
+    const t1 = performance.now();
+    for (let i = 1; i < meta.count; i++) updateFrame();
+    const all = performance.now() - t1;
+    console.log(JSON.stringify({first_frame_ms: first, per_frame_ms: all / Math.max(1, meta.count - 1)}));
+})();`);
+"""
+
+_NODE_OLD = r"""
+const fs = require('fs');
+const payload = fs.readFileSync(process.argv[1], 'utf8');
+const t0 = performance.now();
+const frames = eval(payload);
+console.log(JSON.stringify({first_frame_ms: performance.now() - t0, per_frame_ms: 0}));
+"""
+
+
+def synthetic_clips():
+    # (name, list of BGR frames); seeded, so every run sees the same pixels
+    rng = np.random.default_rng(1234)
+    h, w = 360, 640
+    yy, xx = np.mgrid[0:h, 0:w]
+    base = np.dstack([(xx * 255 // w), (yy * 255 // h), np.full((h, w), 96)]).astype(np.uint8)
+
+    camera = []
+    for i in range(FPS * 10):
+        frame = base.copy()
+        cx = int(80 + (w - 160) * (i / (FPS * 10)))
+        cv2.circle(frame, (cx, h // 2), 60, (40, 200, 255), -1)
+        # sensor noise, the usual worst case for change detection
+        noise = rng.normal(0, 6, frame.shape)
+        camera.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+
+    slides = []
+    for slide in range(4):
+        frame = np.full((h, w, 3), 235, np.uint8)
+        cv2.rectangle(frame, (40, 40), (600, 90), (120, 60, 20), -1)
+        for line in range(6):
+            cv2.putText(frame, f"slide {slide} bullet point {line}", (60, 140 + line * 34),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (30, 30, 30), 2)
+        slides.extend([frame] * (FPS * 5))
+
+    texture = rng.integers(0, 255, (h // 8, w // 8 * 2, 3), dtype=np.uint8)
+    texture = cv2.resize(texture, (w * 2, h), interpolation=cv2.INTER_CUBIC)
+    pan = [np.ascontiguousarray(texture[:, i * 4:i * 4 + w]) for i in range(FPS * 6)]
+
+    return [("camera (moving object + noise)", camera), ("slides", slides), ("pan", pan)]
+
+
+def video_clip(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return os.path.basename(path), frames
+
+
+def convert(frames, width):
+    # default settings: detailed charset, colour, duplicate skipping
+    converter = FrameConverter({})
+    return [converter.convert(frame, width) for frame in frames]
+
+
+def node_timing(script, path):
+    if not shutil.which("node"):
+        return None
+    result = subprocess.run(["node", "-e", script, path], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--width", type=int, default=120)
+    args = parser.parse_args()
+
+    clips = [video_clip(p) for p in args.videos] if args.videos else synthetic_clips()
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"{'clip':<32} {'frames':>6} {'old bytes':>12} {'new bytes':>10} {'ratio':>7} "
+              f"{'old load':>9} {'new load':>9} {'per frame':>9}")
+        for name, frames in clips:
+            ascii_frames = convert(frames, args.width)
+
+            # the old exporter embedded json.dumps(frames), repeats included
+            full, last = [], None
+            for frame in ascii_frames:
+                last = frame if frame is not None else last
+                full.append(last)
+            old_path = os.path.join(tmp, "old.json")
+            with open(old_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(full))
+            old_size = os.path.getsize(old_path)
+
+            new_path = os.path.join(tmp, "new.html")
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    export_to_html(ascii_frames, new_path, FPS)
+                finally:
+                    sys.stdout = stdout
+            new_size = os.path.getsize(new_path)
+
+            old_t = node_timing(_NODE_OLD, old_path)
+            new_t = node_timing(_NODE_NEW, new_path)
+            fmt = lambda t, k: f"{t[k]:.1f}ms" if t else "n/a"
+            print(f"{name:<32} {len(frames):>6} {old_size:>12,} {new_size:>10,} {old_size / new_size:>6.1f}x "
+                  f"{fmt(old_t, 'first_frame_ms'):>9} {fmt(new_t, 'first_frame_ms'):>9} "
+                  f"{fmt(new_t, 'per_frame_ms'):>9}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
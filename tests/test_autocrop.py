@@ -0,0 +1,80 @@
+import argparse
+import os
+
+import numpy as np
+import pytest
+
+from yt2ascii import video_player
+from yt2ascii.ascii_converter import CropDetector
+from yt2ascii.config import Config
+from yt2ascii.video_player import VideoPlayer
+
+
+def _config(**overrides):
+    args = argparse.Namespace(
+        config=None, width=None, fps=None, invert=False, gamma=None, contrast=None,
+        auto_levels=False, no_color=True, charset=None, no_audio=True, no_cache=False,
+        no_adaptive=False, no_dedup=False, workers=None, no_autocrop=False, no_storyboard=True,
+    )
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return Config(args)
+
+
+def _pillarbox(i=0):
+    # 4:3 textured picture centred in a 320x180 frame
+    rng = np.random.default_rng(i)
+    frame = np.zeros((180, 320, 3), dtype=np.uint8)
+    frame[:, 40:280] = rng.integers(60, 220, (180, 240, 3), dtype=np.uint8)
+    return frame
+
+
+def _player(monkeypatch, columns, lines, frame):
+    monkeypatch.setattr(
+        video_player.shutil, "get_terminal_size", lambda fallback=None: os.terminal_size((columns, lines))
+    )
+    player = VideoPlayer(_config())
+    player.source_size = (frame.shape[1], frame.shape[0])
+    player.autocrop = CropDetector()
+    player.autocrop.sample(frame)
+    return player
+
+
+def test_pillarbox_is_detected():
+    crop = CropDetector()
+    crop.sample(_pillarbox())
+    assert crop.rect is not None
+    x, y, w, h = crop.rect
+    assert (y, h) == (0, 180)
+    assert abs(x - 40) <= 2 and abs(w - 240) <= 4
+
+
+@pytest.mark.parametrize("fit_rows", [True, False])
+def test_pillarbox_crop_never_grows_output(monkeypatch, fit_rows):
+    player = _player(monkeypatch, 120, 60, _pillarbox())
+    aspect = player.config.get("aspect_corr", 0.45)
+    full_w = player.compute_width(fit_rows=fit_rows, crop=False)
+    width = player.compute_width(fit_rows=fit_rows)
+    crop_w, crop_h = player.autocrop.content_size(player.source_size)
+    full_cells = full_w * int(180 * full_w / 320 * aspect)
+    cells = width * int(crop_h * width / crop_w * aspect)
+    assert width < full_w
+    assert cells <= full_cells
+    assert 0.0 < player.autocrop.saved(full_w, width, aspect) < 1.0
+
+
+def test_saved_is_never_negative():
+    crop = CropDetector()
+    crop.sample(_pillarbox())
+    # rendering the crop as wide as the whole frame would cost more cells
+    assert crop.saved(120, 120, 0.45) == 0.0
+
+
+def test_dark_object_is_not_a_bar():
+    # a small square sweeping over black must not be mistaken for a picture
+    crop = CropDetector()
+    for y in range(0, 161, 40):
+        frame = np.zeros((180, 320, 3), dtype=np.uint8)
+        frame[y:y + 20, 150:170] = 255
+        crop.sample(frame)
+    assert crop.rect is None
@@ -0,0 +1,103 @@
+import pytest
+
+from yt2ascii.frame_archive import _ENTRY, _FOOTER, ArchiveReader, ArchiveWriter, concat_archives
+
+FIRST = ["\x1b[31mred\x1b[0m", None, "plain é", None, None]
+SECOND = ["next", None, "last"]
+
+
+def _write(path, frames, fps=24, append=False):
+    with ArchiveWriter(str(path), fps, append=append) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+
+def _read(path):
+    with ArchiveReader(str(path)) as reader:
+        return reader.fps, [reader.frame(i) for i in range(len(reader))]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "a.txt"
+    _write(path, FIRST, fps=12.5)
+    assert _read(path) == (12.5, FIRST)
+
+
+def test_repeats_add_no_frame_bytes(tmp_path):
+    path = tmp_path / "a.txt"
+    _write(path, ["x" * 100] + [None] * 50)
+    with ArchiveReader(str(path)) as reader:
+        assert len(reader) == 51
+        assert all(reader.is_repeat(i) for i in range(1, 51))
+        assert bytes(reader[50]) == b"x" * 100
+    assert path.stat().st_size == 100 + 51 * _ENTRY.size + _FOOTER.size
+
+
+def test_repeat_needs_a_previous_frame(tmp_path):
+    with pytest.raises(ValueError):
+        _write(tmp_path / "a.txt", [None])
+
+
+def test_append(tmp_path):
+    path = tmp_path / "a.txt"
+    _write(path, FIRST, fps=12.5)
+    _write(path, SECOND, fps=30, append=True)
+    # the archive keeps its own rate
+    assert _read(path) == (12.5, FIRST + SECOND)
+
+
+def test_concat(tmp_path):
+    a, b, out = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "out.txt"
+    _write(a, FIRST, fps=10)
+    _write(b, SECOND, fps=30)
+    concat_archives(str(out), [str(a), str(b)])
+    assert _read(out) == (10, FIRST + SECOND)
+
+
+def _appended(path):
+    # the finished archive's bytes and cut points inside its append's
+    # frames, index and footer
+    _write(path, FIRST)
+    before = path.stat().st_size
+    _write(path, SECOND, append=True)
+    size = path.stat().st_size
+    index_offset = size - _FOOTER.size - _ENTRY.size * len(FIRST + SECOND)
+    return path.read_bytes(), {
+        "frames": before + 2,
+        "index": index_offset + _ENTRY.size + 3,
+        "footer": size - _FOOTER.size // 2,
+    }
+
+
+@pytest.mark.parametrize("where", ["frames", "index", "footer"])
+def test_torn_append_keeps_previous_frames(tmp_path, where):
+    path = tmp_path / "a.txt"
+    complete, points = _appended(path)
+    with open(path, "r+b") as f:
+        f.truncate(points[where])
+    assert _read(path) == (24, FIRST)
+
+    # the next append drops the torn tail and picks up from the last footer
+    _write(path, SECOND, append=True)
+    assert path.read_bytes() == complete
+
+
+def test_failed_append_is_not_published(tmp_path):
+    path = tmp_path / "a.txt"
+    _write(path, FIRST)
+    original = path.read_bytes()
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(str(path), append=True) as writer:
+            writer.write("half done")
+            raise RuntimeError("converter died")
+    assert path.read_bytes() == original
+
+
+def test_failed_write_is_not_an_archive(tmp_path):
+    path = tmp_path / "a.txt"
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(str(path)) as writer:
+            writer.write("half done")
+            raise RuntimeError("converter died")
+    with pytest.raises(ValueError):
+        ArchiveReader(str(path))
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# none of these may load just to print --help
+HEAVY_MODULES = ("cv2", "numpy", "pygame", "PIL", "yaml")
+
+# cumulative import time of the yt2ascii modules themselves; --help needs
+# about 20 ms, loading cv2 and numpy alone costs well over 100 ms
+IMPORT_BUDGET_MS = 100
+
+
+def _importtime(*args):
+    # [(module, cumulative us, nesting depth)] from python -X importtime
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "yt2ascii", *args],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(cumulative), depth))
+    return imports
+
+
+def test_help_skips_heavy_modules():
+    loaded = {name.split(".")[0] for name, _, _ in _importtime("--help")}
+    assert not loaded & set(HEAVY_MODULES)
+
+
+def test_help_import_budget():
+    imports = _importtime("--help")
+    total_us = sum(us for name, us, depth in imports if depth == 0 and name.split(".")[0] == "yt2ascii")
+    assert total_us > 0
+    assert total_us / 1000 < IMPORT_BUDGET_MS, f"yt2ascii imports took {total_us / 1000:.1f} ms"
+
+
+@pytest.mark.parametrize("command", ["play-export", "concat-export"])
+def test_archive_commands_skip_heavy_modules(command):
+    loaded = {name.split(".")[0] for name, _, _ in _importtime(command, "--help")}
+    assert not loaded & set(HEAVY_MODULES)
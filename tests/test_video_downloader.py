@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from yt2ascii.video_downloader import CONCURRENT_FRAGMENTS, download_video, required_source_width
+
+# stands in for yt-dlp: logs its argv, fails every format or just the
+# width-filtered first one when the URL asks for it, otherwise
+# "downloads" a clip plus its info json
+STUB = textwrap.dedent("""\
+    #!{python}
+    import json, os, sys
+    args = sys.argv[1:]
+    with open(os.environ["YTDLP_STUB_LOG"], "a") as log:
+        log.write(json.dumps(args) + "\\n")
+    fmt = args[args.index("-f") + 1]
+    if "fail-all" in args[-1] or ("fail-first" in args[-1] and "[width>=" in fmt):
+        print("ERROR: Requested format is not available")
+        sys.exit(1)
+    print("[download]  50.0% of 1.00MiB", flush=True)
+    with open("Clip.mp4", "wb") as f:
+        f.write(b"\\0" * 300000)
+    with open("Clip.info.json", "w") as f:
+        json.dump({{"width": 256, "height": 144}}, f)
+""")
+
+
+@pytest.fixture
+def stub_ytdlp(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    exe = bin_dir / "yt-dlp"
+    exe.write_text(STUB.format(python=sys.executable))
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    log = tmp_path / "calls.jsonl"
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setenv("YTDLP_STUB_LOG", str(log))
+
+    def calls():
+        return [json.loads(line) for line in log.read_text().splitlines()]
+    return calls
+
+
+def _download(url, **kwargs):
+    path, tdir = download_video(url, **kwargs)
+    try:
+        return path, sorted(os.listdir(tdir))
+    finally:
+        shutil.rmtree(tdir)
+
+
+def _arg(argv, flag):
+    return argv[argv.index(flag) + 1]
+
+
+def test_required_source_width():
+    assert required_source_width(120, 0.45) == 120
+    # halfblock needs two pixel rows per cell once aspect * 2 exceeds 1
+    assert required_source_width(100, 0.6, pixels_per_cell=2) == 120
+
+
+def test_smallest_adequate_format_without_audio(stub_ytdlp):
+    path, files = _download("https://example.com/v", target_width=120, audio=False)
+    assert os.path.basename(path) == "Clip.mp4"
+    [argv] = stub_ytdlp()
+    fmt = _arg(argv, "-f")
+    assert "[width>=120]" in fmt
+    assert "+ba" not in fmt
+    assert _arg(argv, "-S") == "width~120,+size,+br"
+    assert _arg(argv, "--concurrent-fragments") == str(CONCURRENT_FRAGMENTS)
+    assert "--write-info-json" in argv
+
+
+def test_audio_requested(stub_ytdlp):
+    _download("https://example.com/v", target_width=120, audio=True)
+    [argv] = stub_ytdlp()
+    assert "+ba" in _arg(argv, "-f")
+
+
+def test_no_audio_anywhere_in_ladder(stub_ytdlp):
+    # every rung must stay video-only, including the fallbacks
+    with pytest.raises(RuntimeError):
+        _download("https://example.com/fail-all", target_width=120, audio=False)
+    calls = stub_ytdlp()
+    assert len(calls) > 1
+    for argv in calls:
+        assert "ba" not in _arg(argv, "-f").replace("bv", "")
+
+
+def test_falls_back_after_first_format_fails(stub_ytdlp, capsys):
+    path, files = _download("https://example.com/fail-first", target_width=120, audio=True)
+    first, second = stub_ytdlp()
+    assert "[width>=120]" in _arg(first, "-f")
+    assert "[width>=" not in _arg(second, "-f")
+    # the sort order carries over so the fallback still picks the nearest size
+    assert _arg(second, "-S") == "width~120,+size,+br"
+    assert files == ["Clip.mp4"]
+
+
+def test_reports_fetched_vs_needed(stub_ytdlp, capsys):
+    _, files = _download("https://example.com/v", target_width=120, audio=False)
+    out = capsys.readouterr().out
+    assert "Fetched 0.3 MB at 256x144, render needs 120px wide (~0.1 MB)" in out
+    # the info json is only read for the report, not left next to the video
+    assert files == ["Clip.mp4"]
@@ -1,6 +1,10 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
 import cv2
 import numpy as np
-from typing import Tuple
+
+from .charsets import CHARSETS, HALF_BLOCK
 
 
 def rgb_to_ansi(r: int, g: int, b: int) -> int:
@@ -32,28 +36,226 @@ def reset_color(use_colors: bool) -> str:
     return "\033[0m" if use_colors else ""
 
 
-def frame_to_ascii(
+def rgb_to_ansi_array(bgr: np.ndarray) -> np.ndarray:
+    # vectorized rgb_to_ansi over an (..., 3) BGR array
+    b = bgr[..., 0].astype(np.int32)
+    g = bgr[..., 1].astype(np.int32)
+    r = bgr[..., 2].astype(np.int32)
+    cube = 16 + 36 * (r // 51) + 6 * (g // 51) + b // 51
+    # clamp: rgb_to_ansi yields 256 for r == 248, one past the palette
+    grey = np.where(r < 8, 16, np.where(r > 248, 231, np.minimum(232 + (r - 8) // 10, 255)))
+    return np.where((r == g) & (g == b), grey, cube).astype(np.uint8)
+
+
+FG_CODES = np.array([f"\033[38;5;{i}m" for i in range(256)], dtype=object)
+BG_CODES = np.array([f"\033[48;5;{i}m" for i in range(256)], dtype=object)
+
+# monochrome fallback, indexed by (top lit) * 2 + (bottom lit)
+_MONO_HALF_BLOCKS = np.array([" ", "\u2584", HALF_BLOCK, "\u2588"], dtype=object)
+
+
+class ResizePlan:
+    # output geometry and preallocated resize buffers for one
+    # (source size, output width) pair, so steady-state frames don't allocate
+    
+    def __init__(self, frame_shape: Tuple[int, ...], width: int, aspect_corr: float, pixels_per_cell: int = 1):
+        h, w = frame_shape[:2]
+        self.width = width
+        self.rows = max(1, int(h * (width / w) * aspect_corr))
+        self.size = (width, self.rows * pixels_per_cell)
+        self.color = np.empty((self.size[1], width, 3), dtype=np.uint8)
+        self.gray = np.empty((self.size[1], width), dtype=np.uint8)
+    
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        return cv2.resize(frame, self.size, dst=self.color, interpolation=cv2.INTER_AREA)
+    
+    def to_gray(self, small: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+
+
+class ResizePlanCache:
+    # keeps plans for the few most recently used geometries so toggling
+    # fullscreen or resizing back and forth doesn't reallocate
+    
+    def __init__(self, max_size: int = 4):
+        self.max_size = max_size
+        self.plans: "OrderedDict[tuple, ResizePlan]" = OrderedDict()
+    
+    def get(self, frame_shape: Tuple[int, ...], width: int, aspect_corr: float, pixels_per_cell: int = 1) -> ResizePlan:
+        key = (frame_shape[:2], width, aspect_corr, pixels_per_cell)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = ResizePlan(frame_shape, width, aspect_corr, pixels_per_cell)
+            self.plans[key] = plan
+            if len(self.plans) > self.max_size:
+                self.plans.popitem(last=False)
+        else:
+            self.plans.move_to_end(key)
+        return plan
+
+
+class ToneMap:
+    # folds auto-levels, contrast, gamma and invert into one 256-entry
+    # uint8 -> glyph index table, so tone adjustments cost a single LUT pass;
+    # `curve` is the same mapping onto 0-255 for renderers that draw colors
+    
+    def __init__(
+        self,
+        levels: int,
+        invert: bool = False,
+        gamma: float = 1.0,
+        contrast: float = 1.0,
+        auto_levels: bool = False,
+        auto_levels_interval: int = 30
+    ):
+        if gamma <= 0:
+            raise ValueError(f"gamma must be greater than 0, got {gamma}")
+        if contrast < 0:
+            raise ValueError(f"contrast must not be negative, got {contrast}")
+        self.levels = levels
+        self.invert = invert
+        self.gamma = gamma
+        self.contrast = contrast
+        self.auto_levels = auto_levels
+        self.auto_levels_interval = max(1, auto_levels_interval)
+        self.black = 0
+        self.white = 255
+        self.frames_seen = 0
+        self.lut, self.curve = self.build()
+    
+    @property
+    def identity(self) -> bool:
+        # True when the curve leaves every value unchanged
+        return (self.black, self.white) == (0, 255) and self.contrast == 1.0 and self.gamma == 1.0 and not self.invert
+    
+    def build(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (glyph index table, 0-255 curve); identity steps are skipped so
+        # the default table matches the original float formula exactly
+        v = np.arange(256, dtype=np.float32)
+        if (self.black, self.white) != (0, 255):
+            v = np.clip((v - self.black) / max(1, self.white - self.black), 0.0, 1.0)
+        else:
+            v = v / 255.0
+        if self.contrast != 1.0:
+            v = np.clip((v - 0.5) * self.contrast + 0.5, 0.0, 1.0)
+        if self.gamma != 1.0:
+            v = v ** (1.0 / self.gamma)
+        if self.invert:
+            v = 1.0 - v
+        return (v * (self.levels - 1)).astype(np.uint8), np.round(v * 255).astype(np.uint8)
+    
+    def update_levels(self, gray: np.ndarray):
+        # stretch the 1st..99th percentile of luminance over the full ramp
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+        cdf = np.cumsum(hist)
+        black = int(np.searchsorted(cdf, cdf[-1] * 0.01))
+        white = int(np.searchsorted(cdf, cdf[-1] * 0.99))
+        if white - black < 16:
+            # nearly flat frame (fade, title card): don't amplify noise
+            black, white = 0, 255
+        self.set_levels(black, white)
+    
+    def set_levels(self, black: int, white: int):
+        # levels measured elsewhere (e.g. by a pipeline's decoder); the
+        # tables are only rebuilt when they actually change
+        if (black, white) != (self.black, self.white):
+            self.black, self.white = black, white
+            self.lut, self.curve = self.build()
+    
+    def track(self, gray: np.ndarray):
+        # auto-levels bookkeeping, once per converted frame
+        if self.auto_levels:
+            if self.frames_seen % self.auto_levels_interval == 0:
+                self.update_levels(gray)
+            self.frames_seen += 1
+    
+    def apply(self, gray: np.ndarray) -> np.ndarray:
+        # luminance -> glyph index
+        self.track(gray)
+        return cv2.LUT(gray, self.lut)
+
+
+def cell_height(charset: np.ndarray) -> int:
+    # source pixels stacked in one output cell
+    return 2 if len(charset) == 1 and charset[0] == HALF_BLOCK else 1
+
+
+def _to_gray(small: np.ndarray, plan: Optional[ResizePlan]) -> np.ndarray:
+    if plan is not None:
+        return plan.to_gray(small)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def grid_to_halfblock(
+    small: np.ndarray,
+    use_colors: bool,
+    tone: Optional[ToneMap] = None,
+    plan: Optional[ResizePlan] = None
+) -> str:
+    # two vertical pixels per cell: top pixel as fg, bottom pixel as bg;
+    # the tone curve is applied to every color channel
+    if not use_colors:
+        gray = _to_gray(small, plan)
+        if tone is not None:
+            tone.track(gray)
+            gray = cv2.LUT(gray, tone.curve)
+        lit = gray >= 128
+        cells = _MONO_HALF_BLOCKS[lit[0::2].astype(np.intp) * 2 + lit[1::2]]
+        return "\n".join("".join(row) for row in cells)
+    
+    if tone is not None:
+        if tone.auto_levels:
+            tone.track(_to_gray(small, plan))
+        if not tone.identity:
+            small = cv2.LUT(small, tone.curve)
+    top = small[0::2]
+    bottom = small[1::2]
+    fg = rgb_to_ansi_array(top)
+    bg = rgb_to_ansi_array(bottom)
+    
+    # run-length coalescing: only emit a color when it differs from the
+    # cell to the left; each row starts fresh after the reset
+    fg_new = np.ones(fg.shape, dtype=bool)
+    bg_new = np.ones(bg.shape, dtype=bool)
+    fg_new[:, 1:] = fg[:, 1:] != fg[:, :-1]
+    bg_new[:, 1:] = bg[:, 1:] != bg[:, :-1]
+    cells = np.where(fg_new, FG_CODES[fg], "") + np.where(bg_new, BG_CODES[bg], "") + HALF_BLOCK
+    return "\033[0m\n".join("".join(row) for row in cells) + "\033[0m"
+
+
+def frame_to_halfblock(
     frame: np.ndarray,
     width: int,
-    charset: np.ndarray,
-    invert: bool,
     aspect_corr: float,
-    use_colors: bool
+    use_colors: bool,
+    plans: Optional[ResizePlanCache] = None,
+    tone: Optional[ToneMap] = None
 ) -> str:
-    # convert video frame to ASCII art
-    h, w = frame.shape[:2]
-    new_w = width
-    new_h = max(1, int(h * (new_w / w) * aspect_corr))
+    if plans is not None:
+        plan = plans.get(frame.shape, width, aspect_corr, 2)
+    else:
+        plan = ResizePlan(frame.shape, width, aspect_corr, 2)
+    return grid_to_halfblock(plan.resize(frame), use_colors, tone, plan)
+
+
+def grid_to_ascii(
+    small_color: np.ndarray,
+    charset: np.ndarray,
+    use_colors: bool,
+    tone: Optional[ToneMap] = None,
+    plan: Optional[ResizePlan] = None
+) -> str:
+    # render an already resized grid (one pixel per cell, two for
+    # halfblock), so callers can share it with the ChangeDetector
+    if len(charset) == 1 and charset[0] == HALF_BLOCK:
+        return grid_to_halfblock(small_color, use_colors, tone, plan)
     
-    # resize both color and grayscale versions
-    small_color = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    small_gray = cv2.resize(gray, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    new_h, new_w = small_color.shape[:2]
+    small_gray = _to_gray(small_color, plan)
     
-    norm = small_gray.astype(np.float32) / 255.0
-    if invert:
-        norm = 1.0 - norm
-    idx = (norm * (len(charset) - 1)).astype(np.int32)
+    if tone is None:
+        tone = _default_tone(len(charset))
+    idx = tone.apply(small_gray)
     
     rows = []
     for y in range(new_h):
@@ -73,3 +275,239 @@ def frame_to_ascii(
         result += reset_color(use_colors)
     return result
 
+
+def frame_to_ascii(
+    frame: np.ndarray,
+    width: int,
+    charset: np.ndarray,
+    aspect_corr: float,
+    use_colors: bool,
+    plans: Optional[ResizePlanCache] = None,
+    tone: Optional[ToneMap] = None
+) -> str:
+    # convert video frame to ASCII art; invert, gamma, contrast and
+    # auto-levels all come from the ToneMap (plain linear mapping without one)
+    if plans is not None:
+        plan = plans.get(frame.shape, width, aspect_corr, cell_height(charset))
+    else:
+        plan = ResizePlan(frame.shape, width, aspect_corr, cell_height(charset))
+    # resize once, grayscale is taken of the small image
+    return grid_to_ascii(plan.resize(frame), charset, use_colors, tone, plan)
+
+
+def load_charset(config: dict) -> np.ndarray:
+    # the configured charset as an array of glyphs, "detailed" if unknown
+    return np.array(list(CHARSETS.get(config.get("charset", "detailed"), CHARSETS["detailed"])))
+
+
+def make_tone_map(levels: int, config: dict) -> ToneMap:
+    # tone map for a charset of `levels` glyphs from config settings
+    return ToneMap(
+        levels,
+        config.get("invert", False),
+        config.get("gamma", 1.0),
+        config.get("contrast", 1.0),
+        config.get("auto_levels", False),
+        config.get("auto_levels_interval", 30)
+    )
+
+
+_DEFAULT_TONES = {}
+
+
+def _default_tone(levels: int) -> ToneMap:
+    if levels not in _DEFAULT_TONES:
+        _DEFAULT_TONES[levels] = ToneMap(levels)
+    return _DEFAULT_TONES[levels]
+
+
+class ChangeDetector:
+    # flags frames that would render (almost) the same as the last one shown,
+    # by mean absolute difference over the color channels of the output grid
+    # (so a hue change at equal brightness still counts)
+    
+    def __init__(self, threshold: float = 1.0):
+        self.threshold = threshold
+        self.last_shown = None
+        self.skipped = 0
+    
+    def reset(self):
+        self.last_shown = None
+    
+    def is_duplicate(self, small: np.ndarray) -> bool:
+        # `small` is the grid the converter renders (ResizePlan.resize output)
+        # compare against the last frame actually shown, not the previous
+        # input, so slow fades still get drawn once they add up
+        last = self.last_shown
+        if last is not None and last.shape == small.shape:
+            if cv2.norm(small, last, cv2.NORM_L1) / small.size <= self.threshold:
+                self.skipped += 1
+                return True
+            np.copyto(last, small)  # the plan reuses its buffer, keep our own copy
+        else:
+            self.last_shown = small.copy()
+        return False
+
+
+class CropDetector:
+    # finds the picture area inside burned-in letterbox/pillarbox bars.
+    # Coverage (how much of each row/column was ever lit) only ever grows,
+    # so content seen once is never cropped away; dark edges only count as
+    # bars when they look like bars, see _bars()
+    
+    BAR_MIN_SHARE = 0.02  # thinner bars aren't worth a geometry change
+    CONTENT_MIN_SHARE = 0.25  # 9:16 inside 16:9 is ~0.32
+    EDGE_MIN_COVER = 0.3  # a real picture edge is lit across this share in some sample
+    
+    def __init__(self, limit: int = 24, interval: int = 0):
+        self.limit = limit  # luminance a pixel must exceed to count as picture
+        self.interval = interval  # frames between samples in update(), 0 to disable
+        self.frames_seen = 0
+        self.frame_shape = None
+        self.row_cover = None  # per sampled row, largest lit share seen so far
+        self.col_cover = None
+        self.rect = None  # (x, y, w, h) to crop to, None when not worth it
+    
+    def sample(self, frame: np.ndarray) -> bool:
+        # fold one frame into the coverage; True if the crop changed
+        h, w = frame.shape[:2]
+        if self.frame_shape != (h, w):
+            self.frame_shape = (h, w)
+            self.row_cover = self.col_cover = None
+        # a small copy is enough, and INTER_AREA averages away compression noise
+        small_w = min(w, 160)
+        small_h = max(1, round(h * small_w / w))
+        small = cv2.resize(frame, (small_w, small_h), interpolation=cv2.INTER_AREA)
+        lit = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) > self.limit
+        if not lit.any():
+            return False  # black frame, says nothing about the bars
+        
+        rows = lit.mean(axis=1)
+        cols = lit.mean(axis=0)
+        if self.row_cover is not None:
+            rows = np.maximum(rows, self.row_cover)
+            cols = np.maximum(cols, self.col_cover)
+        self.row_cover, self.col_cover = rows, cols
+        
+        top, bottom = self._bars(rows, h)
+        left, right = self._bars(cols, w)
+        rect = None
+        if top or left:
+            rect = (left, top, w - left - right, h - top - bottom)
+        changed = rect != self.rect
+        self.rect = rect
+        return changed
+    
+    @classmethod
+    def _bars(cls, cover: np.ndarray, size: int) -> Tuple[int, int]:
+        # (leading, trailing) bar thickness in source pixels along one axis;
+        # (0, 0) unless both bars are there, about equal, leave a picture
+        # behind and that picture has a visible edge. Dark content (a small
+        # object on black) fails one of those and is left alone
+        on = np.flatnonzero(cover)
+        first, last = on[0], on[-1]
+        scale = size / len(cover)
+        lead = int(first * scale)
+        trail = size - min(size, int(np.ceil((last + 1) * scale)))
+        if min(lead, trail) < cls.BAR_MIN_SHARE * size:
+            return 0, 0
+        if abs(lead - trail) > max(lead, trail) / 4 + 2 * scale:
+            return 0, 0
+        if size - lead - trail < cls.CONTENT_MIN_SHARE * size:
+            return 0, 0
+        # the edge line may be half bar after downscaling, so allow one more
+        if min(cover[first:first + 2].max(), cover[last - 1:last + 1].max()) < cls.EDGE_MIN_COVER:
+            return 0, 0
+        return lead, trail
+    
+    def probe(self, cap: cv2.VideoCapture, samples: int = 5):
+        # sample frames spread over the whole video, then rewind
+        saved_pos = cap.get(cv2.CAP_PROP_POS_FRAMES)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        positions = [int(total * (i + 0.5) / samples) for i in range(samples)] if total > 0 else [0]
+        for pos in positions:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, pos)
+            ok, frame = cap.read()
+            if ok:
+                self.sample(frame)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, saved_pos)
+    
+    def update(self, frame: np.ndarray) -> bool:
+        # periodic re-check during playback; True if the crop changed
+        self.frames_seen += 1
+        if self.interval and self.frames_seen % self.interval == 0:
+            return self.sample(frame)
+        return False
+    
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        # a view, no pixels are copied
+        if self.rect is None:
+            return frame
+        x, y, w, h = self.rect
+        return frame[y:y + h, x:x + w]
+    
+    def content_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        # (width, height) of what the converter actually sees
+        return (self.rect[2], self.rect[3]) if self.rect else size
+    
+    def fit_width(self, width: int) -> int:
+        # widest output width at which the cropped picture needs no more rows
+        # than the whole frame does at `width`: same pixels per cell, so a
+        # pillarbox crop narrows the output instead of making it taller
+        if self.rect is None:
+            return width
+        h, w = self.frame_shape
+        return max(1, min(width, int(width * (self.rect[2] / w) * (h / self.rect[3]))))
+    
+    def saved(self, full_width: int, width: int, aspect_corr: float) -> float:
+        # share of output cells saved: the whole frame at full_width against
+        # the cropped picture at the width actually used
+        if self.rect is None or not self.frame_shape:
+            return 0.0
+        h, w = self.frame_shape
+        full = full_width * max(1, int(h * (full_width / w) * aspect_corr))
+        cropped = width * max(1, int(self.rect[3] * (width / self.rect[2]) * aspect_corr))
+        # a crop rendered wider than the whole frame saved nothing
+        return max(0.0, 1.0 - cropped / full)
+
+
+class FrameConverter:
+    # the per-frame path shared by playback, exports, batch jobs and mosaic
+    # tiles: crop, one downsample used by both the duplicate check and the
+    # renderer, then render
+    
+    def __init__(
+        self,
+        config: dict,
+        crop: Optional[CropDetector] = None,
+        detector: Optional[ChangeDetector] = None
+    ):
+        self.charset = load_charset(config)
+        self.aspect_corr = config.get("aspect_corr", 0.45)
+        self.use_colors = config.get("use_colors", True)
+        self.skip_duplicates = config.get("skip_duplicates", True)
+        self.detector = detector if detector is not None else ChangeDetector(config.get("duplicate_threshold", 1.0))
+        self.crop = crop
+        self.plans = ResizePlanCache()
+        self.tone = make_tone_map(len(self.charset), config)
+    
+    def downsample(self, frame: np.ndarray, width: int) -> Tuple[ResizePlan, np.ndarray]:
+        # (plan, grid) for the cropped frame at `width`; the grid is the
+        # plan's buffer, valid until its next resize
+        if self.crop:
+            frame = self.crop.apply(frame)
+        plan = self.plans.get(frame.shape, width, self.aspect_corr, cell_height(self.charset))
+        return plan, plan.resize(frame)
+    
+    def is_duplicate(self, small: np.ndarray) -> bool:
+        return self.skip_duplicates and self.detector.is_duplicate(small)
+    
+    def render(self, plan: Optional[ResizePlan], small: np.ndarray) -> str:
+        return grid_to_ascii(small, self.charset, self.use_colors, self.tone, plan)
+    
+    def convert(self, frame: np.ndarray, width: int) -> Optional[str]:
+        # ASCII for one frame, None when it would look like the last one shown
+        plan, small = self.downsample(frame, width)
+        if self.is_duplicate(small):
+            return None
+        return self.render(plan, small)
@@ -3,28 +3,46 @@ import subprocess
 import tempfile
 import sys
 
-try:
-    import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+pygame = None
+
+
+def _import_pygame() -> bool:
+    # pygame is slow to import, only pay for it once audio is actually loaded
+    global pygame
+    if pygame is None:
+        try:
+            import pygame as _pygame
+        except ImportError:
+            return False
+        pygame = _pygame
+    return True
 
 
 class AudioPlayer:
     def __init__(self, enabled: bool = True):
-        self.enabled = enabled and PYGAME_AVAILABLE
+        self.enabled = enabled
+        self.initialized = False
         self.sound = None
         self.channel = None
-        if self.enabled:
-            try:
-                pygame.mixer.init()
-                self.channel = pygame.mixer.Channel(0)
-            except Exception as e:
-                print(f"Warning: Could not initialize audio: {e}", file=sys.stderr)
-                self.enabled = False
+    
+    def init_mixer(self) -> bool:
+        # open the audio device on first use
+        if self.initialized or not self.enabled:
+            return self.enabled
+        self.initialized = True
+        if not _import_pygame():
+            self.enabled = False
+            return False
+        try:
+            pygame.mixer.init()
+            self.channel = pygame.mixer.Channel(0)
+        except Exception as e:
+            print(f"Warning: Could not initialize audio: {e}", file=sys.stderr)
+            self.enabled = False
+        return self.enabled
     
     def load_audio(self, video_path: str) -> bool:
-        if not self.enabled:
+        if not self.init_mixer():
             return False
         
         try:
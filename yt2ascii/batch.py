@@ -0,0 +1,211 @@
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Any, Dict, List, Tuple
+
+from .frame_archive import ArchiveReader, ArchiveWriter
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov", ".avi")
+OUTPUT_EXTENSIONS = {"text": ".txt", "gif": ".gif", "html": ".html", "cast": ".cast"}
+CHECKPOINT_EVERY = 240  # frames converted between checkpoints
+
+# settings that change the converted output; a checkpoint written with
+# different values is discarded instead of resumed, and a finished output
+# whose settings sidecar differs is converted again
+_CHECKPOINT_KEYS = (
+    "target_width", "charset", "invert", "aspect_corr", "use_colors",
+    "skip_duplicates", "duplicate_threshold",
+    "gamma", "contrast", "auto_levels", "auto_levels_interval",
+    "autocrop", "autocrop_limit",
+)
+
+
+def find_jobs(batch_dir: str, out_dir: str, export: str) -> List[Tuple[str, str]]:
+    jobs = []
+    for name in sorted(os.listdir(batch_dir)):
+        source = os.path.join(batch_dir, name)
+        if os.path.isfile(source) and name.lower().endswith(VIDEO_EXTENSIONS):
+            stem = os.path.splitext(name)[0]
+            jobs.append((source, os.path.join(out_dir, stem + OUTPUT_EXTENSIONS[export])))
+    return jobs
+
+
+def _settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: config.get(k) for k in _CHECKPOINT_KEYS}
+
+
+def is_up_to_date(source: str, output: str, config: Dict[str, Any]) -> bool:
+    if not os.path.exists(output) or os.path.getmtime(output) < os.path.getmtime(source):
+        return False
+    # outputs from before the sidecar existed, or converted with other
+    # settings, are converted again
+    try:
+        with open(output + ".settings", 'r') as f:
+            return json.load(f) == _settings(config)
+    except (OSError, ValueError):
+        return False
+
+
+def _load_checkpoint(path: str, expected: Dict[str, Any]) -> int:
+    # number of frames already converted into the .part archive, 0 if stale
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if any(state.get(k) != v for k, v in expected.items()):
+        return 0
+    return state.get("frames_done", 0)
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def convert_job(job: Tuple[str, str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    # worker entry point: convert one video, resuming from its checkpoint
+    import cv2
+
+    from .ascii_converter import CropDetector, FrameConverter
+    from .exporter import export_to_asciicast, export_to_gif, export_to_html
+
+    source, output, export, config = job
+    part_path = output + ".part"
+    checkpoint_path = output + ".ckpt"
+    result = {"source": source, "output": output, "frames": 0, "duplicates": 0, "seconds": 0.0}
+    start = time.time()
+
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            result["status"] = "failed"
+            result["error"] = "could not open video"
+            return result
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        expected = _settings(config)
+        expected["source_mtime"] = os.path.getmtime(source)
+
+        # probed before any resume seek; the probe is deterministic, so a
+        # resumed job crops exactly like the run that wrote the part
+        crop = None
+        if config.get("autocrop", True):
+            crop = CropDetector(config.get("autocrop_limit", 24))
+            crop.probe(cap)
+
+        frames_done = 0
+        if os.path.exists(part_path) and _load_checkpoint(checkpoint_path, expected):
+            # the archive is authoritative: a crash between closing a chunk
+            # and saving the checkpoint leaves it one chunk ahead, and a crash
+            # mid-chunk leaves the previous chunk's footer as the newest valid one
+            try:
+                with ArchiveReader(part_path) as reader:
+                    frames_done = len(reader)
+            except ValueError:
+                frames_done = 0  # not an archive at all (killed in the first chunk)
+        if frames_done:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frames_done)
+        resumed_from = frames_done
+
+        width = config.get("target_width", 120)
+        if crop:
+            # a pillarbox crop narrows the output rather than adding rows
+            width = crop.fit_width(width)
+        converter = FrameConverter(config, crop)
+        done = False
+        while not done:
+            chunk = []
+            while len(chunk) < CHECKPOINT_EVERY:
+                ok, frame = cap.read()
+                if not ok:
+                    done = True
+                    break
+                chunk.append(converter.convert(frame, width))  # None repeats the previous
+
+            # append only the new frames; the archive index is rewritten on close
+            with ArchiveWriter(part_path, fps, append=frames_done > 0) as writer:
+                for ascii_frame in chunk:
+                    writer.write(ascii_frame)
+            frames_done += len(chunk)
+            _save_checkpoint(checkpoint_path, dict(expected, frames_done=frames_done))
+
+        if export == "text":
+            os.replace(part_path, output)
+        elif export == "cast":
+            # streamed frame by frame out of the archive, timed at the source rate
+            with ArchiveReader(part_path) as reader:
+                export_to_asciicast((reader.frame(i) for i in range(len(reader))), output, fps)
+            os.unlink(part_path)
+        else:
+            with ArchiveReader(part_path) as reader:
+                frames = [reader.frame(i) for i in range(len(reader))]
+            if export == "gif":
+                export_to_gif(frames, output, min(fps, config.get("fps_cap", 24)))
+            else:
+                export_to_html(frames, output, min(fps, config.get("fps_cap", 24)))
+            if not os.path.exists(output):
+                # exporter bailed out (e.g. Pillow missing), keep the part for a retry
+                raise RuntimeError(f"{export} export wrote no output")
+            os.unlink(part_path)
+        # the settings go next to the output so a rerun with other settings
+        # converts again instead of skipping it
+        _save_checkpoint(output + ".settings", _settings(config))
+        os.unlink(checkpoint_path)
+
+        result["status"] = "resumed" if resumed_from else "done"
+        result["frames"] = frames_done - resumed_from
+        result["duplicates"] = converter.detector.skipped
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        cap.release()
+        result["seconds"] = time.time() - start
+    return result
+
+
+def print_summary(results: List[Dict[str, Any]], elapsed: float):
+    print(f"\n{'status':<9} {'frames':>8} {'dups':>8} {'secs':>8} {'fps':>8}  source")
+    total_frames = 0
+    for r in results:
+        fps = r["frames"] / r["seconds"] if r["seconds"] > 0 else 0.0
+        total_frames += r["frames"]
+        line = f"{r['status']:<9} {r['frames']:>8} {r.get('duplicates', 0):>8} {r['seconds']:>8.1f} {fps:>8.1f}  {r['source']}"
+        if r.get("error"):
+            line += f" ({r['error']})"
+        print(line)
+    overall = total_frames / elapsed if elapsed > 0 else 0.0
+    print(f"Converted {total_frames} frames from {len(results)} videos in {elapsed:.1f}s ({overall:.1f} frames/s)")
+
+
+def run_batch(batch_dir: str, out_dir: str, export: str, config: Dict[str, Any], workers: int = None) -> bool:
+    # convert every video in batch_dir into its own export in out_dir
+    if not os.path.isdir(batch_dir):
+        print(f"Error: Not a directory: {batch_dir}", file=sys.stderr)
+        return False
+    os.makedirs(out_dir, exist_ok=True)
+
+    results = []
+    pending = []
+    for source, output in find_jobs(batch_dir, out_dir, export):
+        if is_up_to_date(source, output, config):
+            results.append({"source": source, "output": output, "status": "skipped", "frames": 0, "seconds": 0.0})
+        else:
+            pending.append((source, output, export, config))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Batch: {len(pending)} to convert, {len(results)} up to date, {min(workers, max(1, len(pending)))} workers")
+
+    start = time.time()
+    if pending:
+        with Pool(min(workers, len(pending))) as pool:
+            for result in pool.imap_unordered(convert_job, pending):
+                print(f"[{result['status']}] {result['source']} -> {result['output']}")
+                results.append(result)
+    print_summary(results, time.time() - start)
+    return all(r["status"] != "failed" for r in results)
@@ -1,7 +1,12 @@
+# upper half block: fg paints the top pixel, bg the bottom one
+HALF_BLOCK = "▀"
+
 CHARSETS = {
     "detailed": " .`-_:;^~+iIl1tfrjJYCLUXVTwqpdbmgKO0QNBMAESZ23456789%&#@",
     "block": " ░▒▓█",
     "simple": " .#",
-    "alphanum": " .`-_:;^~+iIl1tfrjJYCLUXVTwqpdbmgKO0QNBMAESZ23456789%&#@"
+    "alphanum": " .`-_:;^~+iIl1tfrjJYCLUXVTwqpdbmgKO0QNBMAESZ23456789%&#@",
+    # not a luminance ramp: selects the two-pixels-per-cell renderer
+    "halfblock": HALF_BLOCK
 }
 
@@ -5,21 +5,30 @@ import json
 import argparse
 from typing import Any, Dict
 
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
 DEFAULT_CONFIG = {
     "target_width": 120,
     "fps_cap": 24,
     "invert": False,
+    "gamma": 1.0,
+    "contrast": 1.0,
+    "auto_levels": False,
+    "auto_levels_interval": 30,
     "aspect_corr": 0.45,
     "use_colors": True,
     "charset": "detailed",
     "enable_audio": True,
     "frame_cache_size": 100,
     "adaptive_quality": True,
+    "skip_duplicates": True,
+    "duplicate_threshold": 1.0,
+    "workers": 0,
+    "autocrop": True,
+    "autocrop_limit": 24,
+    "autocrop_interval": 120,
+    "storyboard": True,
+    "storyboard_interval": 5,
+    "storyboard_width": 40,
+    "storyboard_dir": None,
     "auto_detect_terminal": True
 }
 
@@ -41,6 +50,12 @@ class Config:
             self.config["fps_cap"] = args.fps
         if args.invert:  # only override if explicitly set to True
             self.config["invert"] = True
+        if args.gamma is not None:
+            self.config["gamma"] = args.gamma
+        if args.contrast is not None:
+            self.config["contrast"] = args.contrast
+        if args.auto_levels:
+            self.config["auto_levels"] = True
         if args.no_color:
             self.config["use_colors"] = False
         if args.charset:
@@ -51,7 +66,24 @@ class Config:
             self.config["frame_cache_size"] = 0
         if args.no_adaptive:
             self.config["adaptive_quality"] = False
-        
+        if args.no_dedup:
+            self.config["skip_duplicates"] = False
+        if args.workers is not None:
+            self.config["workers"] = args.workers
+        if args.no_autocrop:
+            self.config["autocrop"] = False
+        if args.no_storyboard:
+            self.config["storyboard"] = False
+
+        # tone settings come from the CLI or a config file; checked once here
+        # so every renderer can trust them
+        if not self.config.get("gamma", 1.0) > 0:
+            print(f"Error: gamma must be greater than 0 (got {self.config['gamma']})", file=sys.stderr)
+            sys.exit(1)
+        if not self.config.get("contrast", 1.0) >= 0:
+            print(f"Error: contrast must not be negative (got {self.config['contrast']})", file=sys.stderr)
+            sys.exit(1)
+
         # auto-detect terminal capabilities
         if self.config["auto_detect_terminal"]:
             self.auto_detect_terminal()
@@ -61,7 +93,10 @@ class Config:
         try:
             with open(path, 'r') as f:
                 if path.endswith('.yaml') or path.endswith('.yml'):
-                    if not YAML_AVAILABLE:
+                    # imported here so JSON configs and --help never load PyYAML
+                    try:
+                        import yaml
+                    except ImportError:
                         print(f"Warning: PyYAML is required for YAML config files. Install with: pip install PyYAML", file=sys.stderr)
                         return
                     file_config = yaml.safe_load(f)
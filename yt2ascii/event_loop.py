@@ -0,0 +1,84 @@
+import os
+import selectors
+import signal
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from .keyboard import KeyboardInput
+
+Event = Tuple[str, Optional[str]]
+
+
+class EventLoop:
+    # single wait point for keypresses, terminal resizes and frame deadlines
+
+    def __init__(self, kb: KeyboardInput):
+        self.kb = kb
+        self.selector = None
+        self.wakeup_r = None
+        self.wakeup_w = None
+        self.old_wakeup_fd = None
+        self.old_winch = None
+
+    def __enter__(self):
+        if sys.platform == 'win32':
+            return self
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.kb.fileno(), selectors.EVENT_READ, 'key')
+
+        # signals land on a pipe so they wake the same select() as stdin
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        try:
+            self.old_wakeup_fd = signal.set_wakeup_fd(self.wakeup_w)
+            # SIGWINCH is ignored by default, which would skip the wakeup fd
+            self.old_winch = signal.signal(signal.SIGWINCH, lambda signum, frame: None)
+        except ValueError:
+            # not on the main thread, resizes go unnoticed
+            self.old_wakeup_fd = None
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, 'signal')
+        return self
+
+    def __exit__(self, *args):
+        if self.selector is None:
+            return
+        if self.old_winch is not None:
+            signal.signal(signal.SIGWINCH, self.old_winch)
+            signal.set_wakeup_fd(self.old_wakeup_fd)
+        self.selector.close()
+        os.close(self.wakeup_r)
+        os.close(self.wakeup_w)
+        self.selector = None
+
+    def wait(self, timeout: Optional[float]) -> List[Event]:
+        # block until input, a resize or the timeout; None waits indefinitely
+        if self.selector is None:
+            return self._poll(timeout)
+
+        events: List[Event] = []
+        for key, _ in self.selector.select(timeout):
+            if key.data == 'key':
+                events.extend(('key', k) for k in self.kb.read_keys())
+            else:
+                try:
+                    signums = os.read(self.wakeup_r, 64)
+                except BlockingIOError:
+                    signums = b""
+                if signal.SIGWINCH in signums:
+                    events.append(('resize', None))
+        return events
+
+    def _poll(self, timeout: Optional[float]) -> List[Event]:
+        # msvcrt has no selectable handle, fall back to short polls
+        end = None if timeout is None else time.time() + timeout
+        while True:
+            key = self.kb.get_key()
+            if key:
+                return [('key', key)]
+            remaining = 0.01 if end is None else end - time.time()
+            if remaining <= 0:
+                return []
+            time.sleep(min(0.01, remaining))
@@ -1,31 +1,41 @@
+import base64
 import json
 import re
+import struct
 import sys
-from typing import List
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
 
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILLOW_AVAILABLE = False
+from .frame_archive import ArchiveWriter
 
 
-def export_to_text(frames: List[str], output_path: str):
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for i, frame in enumerate(frames):
-            f.write(f"=== Frame {i+1} ===\n")
-            f.write(frame)
-            f.write("\n\n")
-    print(f"Exported {len(frames)} frames to {output_path}")
+def export_to_text(frames: List[Optional[str]], output_path: str, fps: float = 24, append: bool = False):
+    # seekable frame archive, see frame_archive for the layout;
+    # None entries are stored as repeat-previous records
+    with ArchiveWriter(output_path, fps, append=append) as writer:
+        for frame in frames:
+            writer.write(frame)
+        total = len(writer)
+    print(f"Exported {len(frames)} frames to {output_path} ({total} total)")
 
 
-def export_to_gif(frames: List[str], output_path: str, fps: float = 10):
-    if not PILLOW_AVAILABLE:
+def export_to_gif(frames: List[Optional[str]], output_path: str, fps: float = 10):
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
         print("Error: Pillow is required for GIF export. Install with: pip install Pillow")
         return
     
     images = []
+    durations = []
+    frame_ms = int(1000 / fps)
     for frame in frames:
+        if frame is None:
+            # repeat of the previous frame: just hold it on screen longer
+            if durations:
+                durations[-1] += frame_ms
+            continue
         lines = frame.split('\n')
         height = len(lines)
         width = max(len(line) for line in lines) if lines else 1
@@ -53,19 +63,167 @@ def export_to_gif(frames: List[str], output_path: str, fps: float = 10):
             y += 16
         
         images.append(img)
+        durations.append(frame_ms)
     
     if images:
         images[0].save(
             output_path,
             save_all=True,
             append_images=images[1:],
-            duration=int(1000 / fps),
+            duration=durations,
             loop=0
         )
         print(f"Exported {len(images)} frames to {output_path}")
 
 
-def export_to_html(frames: List[str], output_path: str, fps: float = 10):
+_SGR_RE = re.compile(r'\033\[([0-9;]*)m')
+DEFAULT_FG = 15
+DEFAULT_BG = 0
+
+# record types in the packed HTML frame stream
+_KEYFRAME = 0
+_DELTA = 1
+_REPEAT = 2
+
+
+def _apply_sgr(params: str, fg: int, bg: int) -> Tuple[int, int]:
+    # apply one SGR escape to the current 256-color fg/bg state
+    codes = params.split(';') if params else ['0']
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code in ('', '0'):
+            fg, bg = DEFAULT_FG, DEFAULT_BG
+        elif code == '39':
+            fg = DEFAULT_FG
+        elif code == '49':
+            bg = DEFAULT_BG
+        elif code in ('38', '48') and i + 2 < len(codes) and codes[i + 1] == '5':
+            value = int(codes[i + 2]) & 0xFF
+            if code == '38':
+                fg = value
+            else:
+                bg = value
+            i += 2
+        i += 1
+    return fg, bg
+
+
+def _parse_ansi_frame(frame: str) -> Tuple[int, int, List[str], List[int], List[int]]:
+    # split an ANSI frame into row-major glyphs and fg/bg color indices
+    rows = []
+    fg, bg = DEFAULT_FG, DEFAULT_BG
+    for line in frame.split('\n'):
+        cells = []
+        pos = 0
+        for m in _SGR_RE.finditer(line):
+            cells.extend((ch, fg, bg) for ch in line[pos:m.start()])
+            fg, bg = _apply_sgr(m.group(1), fg, bg)
+            pos = m.end()
+        cells.extend((ch, fg, bg) for ch in line[pos:])
+        rows.append(cells)
+    
+    width = max((len(row) for row in rows), default=0)
+    glyphs, fgs, bgs = [], [], []
+    for row in rows:
+        row.extend([(' ', DEFAULT_FG, DEFAULT_BG)] * (width - len(row)))
+        for ch, f, b in row:
+            glyphs.append(ch)
+            fgs.append(f)
+            bgs.append(b)
+    return width, len(rows), glyphs, fgs, bgs
+
+
+def _write_varint(buf: bytearray, value: int):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _color_planes(frames: List[Optional[str]]) -> Tuple[bool, bool]:
+    # (any fg, any bg) from the SGR codes alone, without parsing cells; a
+    # color set but never drawn only costs an unused plane
+    use_fg = use_bg = False
+    for frame in frames:
+        if frame is None:
+            continue
+        fg, bg = DEFAULT_FG, DEFAULT_BG
+        for m in _SGR_RE.finditer(frame):
+            fg, bg = _apply_sgr(m.group(1), fg, bg)
+            use_fg = use_fg or fg != DEFAULT_FG
+            use_bg = use_bg or bg != DEFAULT_BG
+        if use_fg and use_bg:
+            break
+    return use_fg, use_bg
+
+
+def _pack_html_frames(frames: List[Optional[str]], keyframe_interval: int) -> Tuple[bytes, dict]:
+    # encode frames as keyframes plus per-cell deltas over glyph/color
+    # indices; frames are parsed one at a time, only the previous is kept
+    glyph_table: Dict[str, int] = {}
+    use_fg, use_bg = _color_planes(frames)
+    
+    stream = bytearray()
+    prev = None
+    for n, frame in enumerate(frames):
+        if frame is None:
+            stream.append(_REPEAT)
+            continue
+        width, height, glyphs, fgs, bgs = _parse_ansi_frame(frame)
+        cells = []
+        for ch in glyphs:
+            idx = glyph_table.setdefault(ch, len(glyph_table))
+            if idx > 0xFF:
+                raise ValueError("HTML export supports at most 256 distinct glyphs")
+            cells.append(idx)
+        
+        planes = [cells] + ([fgs] if use_fg else []) + ([bgs] if use_bg else [])
+        changed = None
+        if prev is not None and prev[0] == (width, height) and n % keyframe_interval:
+            # each plane gets its own change list: a recolored cell doesn't
+            # resend its glyph and vice versa
+            changed = [
+                [i for i in range(len(plane)) if plane[i] != old[i]]
+                for plane, old in zip(planes, prev[1])
+            ]
+            # a delta touching most of the frame is no cheaper than a keyframe
+            if sum(len(c) for c in changed) * 2 > len(cells) * len(planes):
+                changed = None
+        
+        if changed is None:
+            stream.append(_KEYFRAME)
+            stream += struct.pack('<HH', width, height)
+            for plane in planes:
+                stream += bytes(plane)
+        else:
+            stream.append(_DELTA)
+            for plane, plane_changed in zip(planes, changed):
+                _write_varint(stream, len(plane_changed))
+                last = -1
+                for i in plane_changed:
+                    _write_varint(stream, i - last - 1)
+                    last = i
+                stream += bytes(plane[i] for i in plane_changed)
+        
+        prev = ((width, height), planes)
+    
+    meta = {
+        "count": len(frames),
+        "glyphs": sorted(glyph_table, key=glyph_table.get),
+        "fg": use_fg,
+        "bg": use_bg,
+    }
+    return zlib.compress(bytes(stream), 9), meta
+
+
+def export_to_html(frames: List[Optional[str]], output_path: str, fps: float = 10, keyframe_interval: Optional[int] = None):
+    # frames are stored compressed and decoded one at a time by the page
+    if keyframe_interval is None:
+        keyframe_interval = max(1, int(fps * 10))
+    packed, meta = _pack_html_frames(frames, keyframe_interval)
+    meta["fps"] = fps
+    
     html = """<!DOCTYPE html>
 <html>
 <head>
@@ -91,6 +249,7 @@ def export_to_html(frames: List[str], output_path: str, fps: float = 10):
         #frame {
             white-space: pre;
             display: inline-block;
+            text-align: left;
         }
         #controls {
             margin-top: 20px;
@@ -105,7 +264,7 @@ def export_to_html(frames: List[str], output_path: str, fps: float = 10):
 </head>
 <body>
     <div id="container">
-        <div id="frame"></div>
+        <div id="frame">Loading...</div>
         <div id="controls">
             <button onclick="play()">Play</button>
             <button onclick="pause()">Pause</button>
@@ -113,21 +272,132 @@ def export_to_html(frames: List[str], output_path: str, fps: float = 10):
         </div>
     </div>
     <script>
-        const frames = """ + json.dumps(frames) + """;
-        let currentFrame = 0;
+        const meta = """ + json.dumps(meta) + """;
+        const packed = '""" + base64.b64encode(packed).decode('ascii') + """';
+        const fps = meta.fps;
+        
+        // xterm 256-color palette
+        const palette = [];
+        const base16 = ['000000', '800000', '008000', '808000', '000080', '800080', '008080', 'c0c0c0',
+                        '808080', 'ff0000', '00ff00', 'ffff00', '0000ff', 'ff00ff', '00ffff', 'ffffff'];
+        base16.forEach(c => palette.push('#' + c));
+        const levels = [0, 95, 135, 175, 215, 255];
+        const hex = v => v.toString(16).padStart(2, '0');
+        for (let r = 0; r < 6; r++)
+            for (let g = 0; g < 6; g++)
+                for (let b = 0; b < 6; b++)
+                    palette.push('#' + hex(levels[r]) + hex(levels[g]) + hex(levels[b]));
+        for (let i = 0; i < 24; i++) palette.push('#' + hex(8 + i * 10).repeat(3));
+        
+        const escapes = {'&': '&amp;', '<': '&lt;', '>': '&gt;'};
+        const glyphs = meta.glyphs.map(ch => escapes[ch] || ch);
+        
+        let data = null;
+        let pos = 0;
+        let width = 0, height = 0;
+        let cells = null, fg = null, bg = null;
+        let currentFrame = -1;
         let interval = null;
-        const fps = """ + str(fps) + """;
+        
+        async function inflate(b64) {
+            const bin = atob(b64);
+            const bytes = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            return new Uint8Array(await new Response(stream).arrayBuffer());
+        }
+        
+        function readVarint() {
+            let value = 0, shift = 0, b;
+            do {
+                b = data[pos++];
+                value += (b & 0x7f) * Math.pow(2, shift);
+                shift += 7;
+            } while (b & 0x80);
+            return value;
+        }
+        
+        function applyDelta(plane) {
+            // per-plane list of changed cells (gap varints), then their values
+            const n = readVarint();
+            const idx = new Array(n);
+            let last = -1;
+            for (let i = 0; i < n; i++) idx[i] = last = last + readVarint() + 1;
+            const values = take(n);
+            for (let i = 0; i < n; i++) plane[idx[i]] = values[i];
+        }
+        
+        function take(n) {
+            const out = data.subarray(pos, pos + n);
+            pos += n;
+            return out;
+        }
+        
+        function decodeFrame() {
+            const type = data[pos++];
+            if (type === """ + str(_KEYFRAME) + """) {
+                width = data[pos] | (data[pos + 1] << 8);
+                height = data[pos + 2] | (data[pos + 3] << 8);
+                pos += 4;
+                const n = width * height;
+                cells = take(n).slice();
+                if (meta.fg) fg = take(n).slice();
+                if (meta.bg) bg = take(n).slice();
+            } else if (type === """ + str(_DELTA) + """) {
+                applyDelta(cells);
+                if (meta.fg) applyDelta(fg);
+                if (meta.bg) applyDelta(bg);
+            }
+            currentFrame++;
+            return type !== """ + str(_REPEAT) + """;
+        }
+        
+        function render() {
+            const parts = [];
+            for (let y = 0; y < height; y++) {
+                let run = '', runFg = -1, runBg = -1;
+                const flush = () => {
+                    if (!run) return;
+                    if (runFg < 0 && runBg < 0) { parts.push(run); return; }
+                    let style = '';
+                    if (runFg >= 0) style += 'color:' + palette[runFg] + ';';
+                    if (runBg >= 0) style += 'background:' + palette[runBg] + ';';
+                    parts.push('<span style="' + style + '">' + run + '</span>');
+                };
+                for (let x = 0; x < width; x++) {
+                    const i = y * width + x;
+                    const f = meta.fg ? fg[i] : -1;
+                    const b = meta.bg ? bg[i] : -1;
+                    if (f !== runFg || b !== runBg) {
+                        flush();
+                        run = '';
+                        runFg = f;
+                        runBg = b;
+                    }
+                    run += glyphs[cells[i]];
+                }
+                flush();
+                parts.push('\\n');
+            }
+            document.getElementById('frame').innerHTML = parts.join('');
+        }
+        
+        function rewind() {
+            pos = 0;
+            currentFrame = -1;
+        }
         
         function updateFrame() {
-            document.getElementById('frame').innerHTML = frames[currentFrame];
+            if (!data || !meta.count) return;
+            if (currentFrame + 1 >= meta.count) rewind();
+            // repeat records leave the page untouched
+            if (decodeFrame()) render();
         }
         
         function play() {
+            if (!data) return;
             if (interval) clearInterval(interval);
-            interval = setInterval(() => {
-                currentFrame = (currentFrame + 1) % frames.length;
-                updateFrame();
-            }, 1000 / fps);
+            interval = setInterval(updateFrame, 1000 / fps);
             updateFrame();
         }
         
@@ -137,11 +407,14 @@ def export_to_html(frames: List[str], output_path: str, fps: float = 10):
         
         function stop() {
             if (interval) clearInterval(interval);
-            currentFrame = 0;
+            rewind();
             updateFrame();
         }
         
-        updateFrame();
+        inflate(packed).then(bytes => {
+            data = bytes;
+            updateFrame();
+        });
     </script>
 </body>
 </html>"""
@@ -150,3 +423,147 @@ def export_to_html(frames: List[str], output_path: str, fps: float = 10):
         f.write(html)
     print(f"Exported {len(frames)} frames to {output_path}")
 
+
+# unchanged cells between two changed runs are re-sent rather than
+# skipped when that is cheaper than another cursor move
+_CAST_GAP = 6
+_CAST_SIZE_DIGITS = 5  # header width/height are padded to this, see AsciicastWriter.close()
+_CAST_EMPTY_SIZE = (80, 24)  # header size of a recording with no frames
+
+
+def _sgr_for(pen: Optional[Tuple[int, int]], fg: int, bg: int) -> str:
+    # shortest SGR that takes the terminal from pen to (fg, bg)
+    if pen == (fg, bg):
+        return ""
+    if (fg, bg) == (DEFAULT_FG, DEFAULT_BG):
+        return "\033[0m"
+    codes = ["0"] if pen is None else []
+    pf, pb = pen if pen is not None else (DEFAULT_FG, DEFAULT_BG)
+    if pen is None or fg != pf:
+        if fg != DEFAULT_FG:
+            codes.append(f"38;5;{fg}")
+        elif pen is not None:
+            codes.append("39")
+    if pen is None or bg != pb:
+        if bg != DEFAULT_BG:
+            codes.append(f"48;5;{bg}")
+        elif pen is not None:
+            codes.append("49")
+    return f"\033[{';'.join(codes)}m"
+
+
+class AsciicastWriter:
+    # streams frames into an asciicast v2 file (one JSON header line, then
+    # one [time, "o", data] event per line); each event redraws only the
+    # cells that changed since the previous frame. The header's size is the
+    # largest frame seen, patched in on close since later sources may be bigger
+
+    def __init__(self, path: str, fps: float = 24, title: Optional[str] = None):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.fps = fps or 24
+        self.title = title
+        self.timestamp = int(time.time())
+        self.count = 0
+        self.events = 0
+        self.size = None  # (width, height), the largest frame so far
+        self.prev = None  # (glyphs, fgs, bgs, width) currently on screen
+        self.pen = None  # SGR state the player's terminal is in, None if unknown
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _header(self) -> str:
+        # width/height padded to a fixed length (JSON allows the spaces) so
+        # close() can rewrite them in place
+        width, height = self.size
+        rest = {"timestamp": self.timestamp, "env": {"TERM": "xterm-256color"}}
+        if self.title:
+            rest["title"] = self.title
+        return (f'{{"version": 2, "width": {width:<{_CAST_SIZE_DIGITS}}, "height": {height:<{_CAST_SIZE_DIGITS}}, '
+                + json.dumps(rest, ensure_ascii=False)[1:] + "\n")
+
+    def _event(self, t: float, data: str):
+        self.file.write(json.dumps([round(t, 6), "o", data], ensure_ascii=False))
+        self.file.write("\n")
+        self.events += 1
+
+    def write(self, frame: Optional[str]):
+        # None (a repeated frame) only advances the clock
+        t = self.count / self.fps
+        self.count += 1
+        if frame is None:
+            return
+        width, height, glyphs, fgs, bgs = _parse_ansi_frame(frame)
+        if max(width, height) >= 10 ** _CAST_SIZE_DIGITS:
+            raise ValueError(f"frame of {width}x{height} cells is too large for an asciicast")
+        out = []
+        if self.size is None:
+            self.size = (width, height)
+            self.file.write(self._header())
+            out.append("\033[?25l\033[2J")
+        else:
+            self.size = (max(self.size[0], width), max(self.size[1], height))
+            if self.prev is not None and (len(self.prev[0]), self.prev[3]) != (len(glyphs), width):
+                # geometry changed (next source in a multi-source export)
+                out.append("\033[0m\033[2J")
+                self.pen = None
+                self.prev = None
+        
+        prev = self.prev
+        for y in range(height):
+            row = range(y * width, (y + 1) * width)
+            if prev is None:
+                changed = list(row)
+            else:
+                pg, pf, pb, _ = prev
+                changed = [i for i in row if glyphs[i] != pg[i] or fgs[i] != pf[i] or bgs[i] != pb[i]]
+            if not changed:
+                continue
+            # merge changed cells into runs, bridging short unchanged gaps
+            runs = [[changed[0], changed[0]]]
+            for i in changed[1:]:
+                if i - runs[-1][1] <= _CAST_GAP:
+                    runs[-1][1] = i
+                else:
+                    runs.append([i, i])
+            for start, end in runs:
+                out.append(f"\033[{y + 1};{start - y * width + 1}H")
+                for i in range(start, end + 1):
+                    sgr = _sgr_for(self.pen, fgs[i], bgs[i])
+                    if sgr:
+                        out.append(sgr)
+                        self.pen = (fgs[i], bgs[i])
+                    out.append(glyphs[i])
+        
+        self.prev = (glyphs, fgs, bgs, width)
+        if out:
+            self._event(t, "".join(out))
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.size is None:
+            # nothing was drawn: still a valid, empty recording
+            self.size = _CAST_EMPTY_SIZE
+            self.file.write(self._header())
+        else:
+            # restore the player's terminal once the last frame has had its time
+            self._event(self.count / self.fps, "\033[0m\033[?25h")
+            # the header was written before later (possibly larger) frames
+            self.file.seek(0)
+            self.file.write(self._header())
+        self.file.close()
+
+
+def export_to_asciicast(frames: Iterable[Optional[str]], output_path: str, fps: float = 24):
+    # frames may be any iterable, e.g. a generator straight off the converter
+    with AsciicastWriter(output_path, fps) as writer:
+        for frame in frames:
+            writer.write(frame)
+    print(f"Exported {len(writer)} frames to {output_path} ({writer.events} events)")
@@ -0,0 +1,208 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import List, Optional, Tuple, Union
+
+# layout: raw ANSI frame bytes back to back, then the index (one
+# little-endian uint64 offset/length pair per frame), then a fixed-size
+# footer pointing at the index. A frame that repeats the previous one
+# reuses its index entry and adds no frame bytes. Appends write their
+# frames after the existing footer and publish a complete new index and
+# footer last, so the previous footer stays valid until then.
+MAGIC = b"YT2AIDX2"
+_FOOTER = struct.Struct("<8sdQQ")  # magic, fps, frame count, index offset
+_ENTRY = struct.Struct("<QQ")
+
+
+def _read_footer(f) -> tuple:
+    # (fps, frame count, index offset, end of footer) of the newest complete
+    # footer; anything after it is an append that never finished
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    if size < _FOOTER.size:
+        raise ValueError("Not a frame archive: file too small")
+    f.seek(size - _FOOTER.size)
+    magic, fps, count, index_offset = _FOOTER.unpack(f.read(_FOOTER.size))
+    if magic == MAGIC and index_offset + _ENTRY.size * count == size - _FOOTER.size:
+        return fps, count, index_offset, size
+
+    # torn tail: search backwards for the last footer whose index ends right before it
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = mm.rfind(MAGIC, 0, size - _FOOTER.size + len(MAGIC))
+        while pos >= 0:
+            if pos + _FOOTER.size <= size:
+                magic, fps, count, index_offset = _FOOTER.unpack_from(mm, pos)
+                if index_offset + _ENTRY.size * count == pos:
+                    return fps, count, index_offset, pos + _FOOTER.size
+            pos = mm.rfind(MAGIC, 0, pos + len(MAGIC) - 1)
+    raise ValueError("Not a frame archive: bad footer magic")
+
+
+class ArchiveWriter:
+    # streams frames into an archive; the index is written on close, and
+    # only if the with-block finished without an exception
+
+    def __init__(self, path: str, fps: float = 24, append: bool = False):
+        self.entries: List[Tuple[int, int]] = []
+        self.fps = fps
+        self.start = 0  # where this writer's frames begin
+        if append and os.path.exists(path):
+            # existing frames, index and footer are left untouched; new
+            # frames go after the footer and a new index supersedes it on close
+            self.file = open(path, 'r+b')
+            self.fps, count, index_offset, end = _read_footer(self.file)
+            self.file.seek(index_offset)
+            self.entries = list(_ENTRY.iter_unpack(self.file.read(_ENTRY.size * count)))
+            # drop whatever an interrupted append left behind the last footer
+            self.file.seek(end)
+            self.file.truncate()
+            self.start = end
+        else:
+            self.file = open(path, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def write(self, frame: Union[str, bytes, None]):
+        # None records a repeat of the previous frame
+        if frame is None:
+            self.write_repeat()
+            return
+        if isinstance(frame, str):
+            frame = frame.encode('utf-8')
+        self.entries.append((self.file.tell(), len(frame)))
+        self.file.write(frame)
+
+    def write_repeat(self):
+        if not self.entries:
+            raise ValueError("Cannot repeat before the first frame")
+        self.entries.append(self.entries[-1])
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        for offset, length in self.entries:
+            self.file.write(_ENTRY.pack(offset, length))
+        # frames and index must be on disk before the footer that publishes them
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.write(_FOOTER.pack(MAGIC, self.fps, len(self.entries), index_offset))
+        self.file.close()
+
+    def abort(self):
+        # drop this writer's frames without publishing them; an appended
+        # archive is left exactly as it was before the append
+        if self.file.closed:
+            return
+        self.file.truncate(self.start)
+        self.file.close()
+
+
+class ArchiveReader:
+    # memory-mapped random access to archived frames
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.fps, self.count, index_offset, _ = _read_footer(f)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = memoryview(self.mm)[index_offset:index_offset + _ENTRY.size * self.count].cast('Q')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _check(self, i: int) -> int:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("frame index out of range")
+        return i
+
+    def __getitem__(self, i: int) -> memoryview:
+        i = self._check(i)
+        offset = self.index[2 * i]
+        return memoryview(self.mm)[offset:offset + self.index[2 * i + 1]]
+
+    def is_repeat(self, i: int) -> bool:
+        i = self._check(i)
+        return i > 0 and self.index[2 * i] == self.index[2 * i - 2] and self.index[2 * i + 1] == self.index[2 * i - 1]
+
+    def frame(self, i: int) -> Optional[str]:
+        # decoded frame, or None when it repeats the previous one
+        if self.is_repeat(i):
+            return None
+        view = self[i]
+        text = bytes(view).decode('utf-8')
+        view.release()
+        return text
+
+    def close(self):
+        self.index.release()
+        self.mm.close()
+
+
+def concat_archives(output_path: str, input_paths: List[str]):
+    # frames are copied byte for byte, nothing is re-encoded
+    if not input_paths:
+        raise ValueError("No input archives given")
+    fps = None
+    with ArchiveReader(input_paths[0]) as first:
+        fps = first.fps
+    with ArchiveWriter(output_path, fps) as writer:
+        for path in input_paths:
+            with ArchiveReader(path) as reader:
+                for i in range(len(reader)):
+                    if reader.is_repeat(i):
+                        writer.write_repeat()
+                        continue
+                    frame = reader[i]
+                    writer.write(frame)
+                    frame.release()
+    print(f"Concatenated {len(input_paths)} archives into {output_path}")
+
+
+def play_archive(path: str, fps: float = None):
+    with ArchiveReader(path) as reader:
+        frame_delay = 1.0 / (fps or reader.fps or 24)
+        out = sys.stdout.buffer
+        out.write(b"\x1b[2J")
+        next_time = time.time()
+        try:
+            for i in range(len(reader)):
+                # repeated frames are already on screen
+                if not reader.is_repeat(i):
+                    frame = reader[i]
+                    out.write(b"\x1b[H")
+                    out.write(frame)
+                    out.flush()
+                    frame.release()
+
+                next_time += frame_delay
+                sleep_for = next_time - time.time()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                elif sleep_for < -frame_delay:
+                    # fell behind, resync instead of bursting frames
+                    next_time = time.time()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.write(b"\x1b[0m\n")
+            out.flush()
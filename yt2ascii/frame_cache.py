@@ -1,14 +1,14 @@
-from typing import Optional, Dict
+from typing import Dict, Hashable, Optional
 from collections import deque
 
 
 class FrameCache:
     def __init__(self, max_size: int = 100):
-        self.cache: Dict[int, str] = {}
+        self.cache: Dict[Hashable, str] = {}
         self.max_size = max_size
         self.access_order = deque()
     
-    def get(self, frame_num: int) -> Optional[str]:
+    def get(self, frame_num: Hashable) -> Optional[str]:
         if frame_num in self.cache:
             # update access order
             if frame_num in self.access_order:
@@ -17,7 +17,7 @@ class FrameCache:
             return self.cache[frame_num]
         return None
     
-    def put(self, frame_num: int, ascii_frame: str):
+    def put(self, frame_num: Hashable, ascii_frame: str):
         if self.max_size <= 0:
             return
         
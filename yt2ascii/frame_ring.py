@@ -0,0 +1,208 @@
+import multiprocessing as mp
+import shutil
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .ascii_converter import ChangeDetector, CropDetector, FrameConverter, cell_height
+
+
+class FrameRing:
+    # fixed ring of byte slots in shared memory holding downsampled BGR
+    # grids; processes exchange slot indices instead of pickled frames
+
+    def __init__(self, slot_size: int, slots: int, name: Optional[str] = None):
+        self.slot_size = slot_size
+        self.slots = slots
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=slot_size * slots)
+        self.frames = np.ndarray((slots, slot_size), dtype=np.uint8, buffer=self.shm.buf)
+
+    def grid(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        # the slot's leading bytes viewed as a grid of the given shape
+        return self.frames[slot, :int(np.prod(shape))].reshape(shape)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _convert_worker(ring_name: str, slot_size: int, slots: int, config: Dict[str, Any], tasks, results):
+    # converter process: render a slot's grid, send back only the ASCII text.
+    # Auto-levels are measured by the decoder and sent with each task, so
+    # every process renders a frame with exactly the levels inline would
+    ring = FrameRing(slot_size, slots, name=ring_name)
+    converter = FrameConverter(dict(config, auto_levels=False))
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, shape, levels = task
+            converter.tone.set_levels(*levels)
+            results.put((seq, slot, converter.render(None, ring.grid(slot, shape))))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+class FramePipeline:
+    # decodes and downsamples in this process, so the duplicate check and
+    # the converter share one resize, and fans the per-cell rendering of the
+    # grids out to worker processes, handing results back in frame order
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        config: Dict[str, Any],
+        width: int,
+        workers: int,
+        slots: Optional[int] = None,
+        detector: Optional[ChangeDetector] = None,
+        crop: Optional[CropDetector] = None
+    ):
+        self.cap = cap
+        self.width = width
+        self.aspect_corr = config.get("aspect_corr", 0.45)
+        self.crop = crop
+        self.crop_changed = False  # set when the crop grows, cleared by reset()
+        # crops, downsamples, checks duplicates and tracks auto-levels in
+        # decode order, exactly like an inline converter; workers only render
+        self.converter = FrameConverter(config, crop, detector)
+        self.config = config
+        shape = (
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            3,
+        )
+        self.frame = np.empty(shape, dtype=np.uint8)  # decode target, reused
+        # slots hold grids, not frames: size them for the widest output
+        # likely this session (a crop is refit to take no more cells)
+        columns = max(width, config.get("target_width", 120), shutil.get_terminal_size((width, 40)).columns)
+        rows = int(shape[0] * (columns / max(1, shape[1])) * self.aspect_corr) + 1
+        # enough slots to keep every worker busy while results wait in order
+        self.slots = slots or workers * 2 + 2
+        self.worker_count = workers
+        self.tasks = mp.Queue()
+        self.results = mp.Queue()
+        self.ring = None
+        self.workers: List[mp.Process] = []
+        self._start(columns * rows * cell_height(self.converter.charset) * 3)
+
+        self.next_read = 0  # sequence number of the next decoded frame
+        self.next_out = 0  # sequence number next() returns
+        self.in_flight = 0
+        self.eof = False
+        self.meta: Dict[int, Tuple[int, float]] = {}
+        self.done: Dict[int, Optional[str]] = {}
+
+    def _start(self, slot_size: int):
+        self.ring = FrameRing(slot_size, self.slots)
+        self.free: List[int] = list(range(self.slots))
+        self.workers = [
+            mp.Process(
+                target=_convert_worker,
+                args=(self.ring.name, slot_size, self.slots, self.config, self.tasks, self.results),
+                daemon=True,
+            )
+            for _ in range(self.worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def _stop(self):
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+        self.ring.close()
+
+    def _grow_ring(self, slot_size: int):
+        # a grid outgrew the slots (e.g. the terminal got much wider): let
+        # the work in flight finish, then restart the workers on a bigger ring
+        while self.in_flight:
+            self._collect()
+        self._stop()
+        self._start(slot_size)
+
+    def _read_into_slot(self) -> bool:
+        buf = self.frame
+        ok, frame = self.cap.read(buf)
+        if ok and frame is not buf:
+            # decoder changed size mid-stream; fit it into the original geometry
+            if frame.shape != buf.shape:
+                frame = cv2.resize(frame, (buf.shape[1], buf.shape[0]), interpolation=cv2.INTER_AREA)
+            np.copyto(buf, frame)
+        if not ok:
+            self.eof = True
+            return False
+
+        seq = self.next_read
+        self.next_read += 1
+        self.meta[seq] = (
+            int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)),
+            self.cap.get(cv2.CAP_PROP_POS_MSEC),
+        )
+        if self.crop and self.crop.update(buf):
+            self.crop_changed = True
+        plan, small = self.converter.downsample(buf, self.width)
+        if self.converter.is_duplicate(small):
+            self.done[seq] = None  # repeat previous, no conversion needed
+            return True
+        
+        tone = self.converter.tone
+        if tone.auto_levels:
+            tone.track(plan.to_gray(small))
+        levels = (tone.black, tone.white)
+        if small.size > self.ring.slot_size:
+            self._grow_ring(small.size)
+        slot = self.free.pop()
+        np.copyto(self.ring.grid(slot, small.shape), small)
+        self.tasks.put((seq, slot, small.shape, levels))
+        self.in_flight += 1
+        return True
+
+    def _collect(self):
+        seq, slot, text = self.results.get()
+        self.done[seq] = text
+        self.free.append(slot)
+        self.in_flight -= 1
+
+    def next(self) -> Optional[Tuple[Tuple[int, float], Optional[str]]]:
+        # ((frame number, position in ms), ascii or None for a repeat); None at EOF
+        # duplicates take no slot, so also cap how far
+        # the decoder runs ahead of the screen
+        while self.free and not self.eof and self.next_read - self.next_out < self.ring.slots:
+            self._read_into_slot()
+        while self.next_out not in self.done:
+            if self.in_flight == 0:
+                return None
+            self._collect()
+        seq = self.next_out
+        self.next_out += 1
+        return self.meta.pop(seq), self.done.pop(seq)
+
+    def reset(self):
+        # drop everything in flight, e.g. after a seek or width change
+        while self.in_flight:
+            self._collect()
+        self.done.clear()
+        self.meta.clear()
+        self.next_out = self.next_read
+        self.eof = False
+        self.crop_changed = False
+
+    def close(self):
+        self.reset()
+        self._stop()
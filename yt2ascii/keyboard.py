@@ -1,6 +1,8 @@
+import codecs
+import os
 import sys
 import select
-from typing import Optional
+from typing import List, Optional
 
 if sys.platform != 'win32':
     import termios
@@ -8,10 +10,31 @@ if sys.platform != 'win32':
 else:
     import msvcrt
 
+_KEY_NAMES = {
+    ' ': 'SPACE',
+    'q': 'Q',
+    'Q': 'Q',
+    'f': 'F',
+    'F': 'F',
+    '+': 'PLUS',
+    '-': 'MINUS',
+    '\n': 'ENTER',
+}
+
+_ARROWS = {
+    'D': 'LEFT',
+    'C': 'RIGHT',
+    'A': 'UP',
+    'B': 'DOWN',
+}
+
 
 class KeyboardInput:
     def __init__(self):
         self.old_settings = None
+        self.pending = ""
+        self.keys: List[str] = []
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
         if sys.platform != 'win32':
             self.old_settings = termios.tcgetattr(sys.stdin)
             tty.setcbreak(sys.stdin.fileno())
@@ -23,6 +46,38 @@ class KeyboardInput:
         if self.old_settings:
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
     
+    def fileno(self) -> int:
+        return sys.stdin.fileno()
+    
+    def read_keys(self) -> List[str]:
+        # drain whatever stdin has ready without blocking (POSIX only)
+        try:
+            data = os.read(self.fileno(), 1024)
+        except (BlockingIOError, InterruptedError):
+            data = b""
+        self.pending += self.decoder.decode(data)
+        
+        keys = []
+        buf = self.pending
+        i = 0
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '\x1b':
+                if i + 1 >= len(buf):
+                    break  # may be the start of a sequence still in flight
+                if buf[i + 1] in '[O':
+                    if i + 2 >= len(buf):
+                        break
+                    keys.append(_ARROWS.get(buf[i + 2], 'ESC'))
+                    i += 3
+                    continue
+                keys.append('ESC')
+            else:
+                keys.append(_KEY_NAMES.get(ch, ch))
+            i += 1
+        self.pending = buf[i:]
+        return keys
+    
     def has_input(self) -> bool:
         if sys.platform == 'win32':
             return msvcrt.kbhit()
@@ -30,6 +85,8 @@ class KeyboardInput:
             return select.select([sys.stdin], [], [], 0)[0] != []
     
     def get_key(self) -> Optional[str]:
+        if self.keys:
+            return self.keys.pop(0)
         if not self.has_input():
             return None
         
@@ -64,31 +121,6 @@ class KeyboardInput:
             except:
                 return None
         else:
-            key = sys.stdin.read(1)
-            if key == '\x1b':  # ESC sequence
-                try:
-                    key += sys.stdin.read(2)
-                    if key == '\x1b[D':
-                        return 'LEFT'
-                    elif key == '\x1b[C':
-                        return 'RIGHT'
-                    elif key == '\x1b[A':
-                        return 'UP'
-                    elif key == '\x1b[B':
-                        return 'DOWN'
-                except:
-                    return 'ESC'
-            elif key == ' ':
-                return 'SPACE'
-            elif key == 'q' or key == 'Q':
-                return 'Q'
-            elif key == 'f' or key == 'F':
-                return 'F'
-            elif key == '+':
-                return 'PLUS'
-            elif key == '-':
-                return 'MINUS'
-            elif key == '\n':
-                return 'ENTER'
-            return key
-
+            if not self.keys:
+                self.keys = self.read_keys()
+            return self.keys.pop(0) if self.keys else None
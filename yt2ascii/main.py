@@ -1,20 +1,49 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import shutil
 import sys
 import time
 
-import cv2
-
-from .ascii_converter import frame_to_ascii
+# heavy modules (cv2, numpy, pygame, PIL, yaml) are imported inside the
+# code path that needs them so --help and exports start fast
 from .charsets import CHARSETS
 from .config import Config
-from .exporter import export_to_gif, export_to_html, export_to_text
-from .video_downloader import download_video
-from .video_player import VideoPlayer
+
+
+ARCHIVE_COMMANDS = ("play-export", "concat-export")
+
+
+def archive_main(argv):
+    # subcommands operating on text export archives
+    parser = argparse.ArgumentParser(prog="python -m yt2ascii")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    play_parser = subparsers.add_parser("play-export", help="Replay a text export archive")
+    play_parser.add_argument("archive", help="Archive written by --export text")
+    play_parser.add_argument("--fps", type=float, help="Override the recorded FPS")
+    
+    concat_parser = subparsers.add_parser("concat-export", help="Concatenate text export archives")
+    concat_parser.add_argument("output", help="Output archive path")
+    concat_parser.add_argument("inputs", nargs="+", help="Archives to concatenate, in order")
+    
+    args = parser.parse_args(argv)
+    from .frame_archive import concat_archives, play_archive
+    try:
+        if args.command == "play-export":
+            play_archive(args.archive, args.fps)
+        else:
+            concat_archives(args.output, args.inputs)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ARCHIVE_COMMANDS:
+        archive_main(sys.argv[1:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="Convert videos to ASCII art and play them in your terminal.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -24,76 +53,209 @@ Examples:
   python -m yt2ascii video.mp4 --width 80 --fps 15
   python -m yt2ascii video.mp4 --charset block --no-color
   python -m yt2ascii video1.mp4 video2.mp4 --export gif output.gif
+  python -m yt2ascii play-export frames.txt
+  python -m yt2ascii cam1.mp4 cam2.mp4 cam3.mp4 cam4.mp4 --grid 2x2
+  python -m yt2ascii --batch clips/ --out-dir exports/ --export html
         """
     )
     
-    parser.add_argument("sources", nargs="+", help="YouTube URL(s) or local video file(s)")
+    parser.add_argument("sources", nargs="*", help="YouTube URL(s) or local video file(s)")
     parser.add_argument("--width", type=int, help="Maximum width of ASCII output (default: 120)")
     parser.add_argument("--fps", type=float, help="Maximum FPS for playback (default: 24)")
     parser.add_argument("--invert", action="store_true", help="Flip dark/light mapping")
+    parser.add_argument("--gamma", type=float, help="Gamma applied to luminance, >1 brightens midtones (default: 1.0)")
+    parser.add_argument("--contrast", type=float, help="Contrast around mid-grey (default: 1.0)")
+    parser.add_argument("--auto-levels", action="store_true", help="Stretch each scene's luminance range over the charset")
     parser.add_argument("--no-color", action="store_true", help="Disable ANSI colors")
     parser.add_argument("--charset", choices=list(CHARSETS.keys()), help="Character set preset")
     parser.add_argument("--no-audio", action="store_true", help="Disable audio playback")
     parser.add_argument("--no-cache", action="store_true", help="Disable frame caching")
     parser.add_argument("--no-adaptive", action="store_true", help="Disable adaptive quality")
+    parser.add_argument("--no-dedup", action="store_true", help="Convert and draw every frame, even unchanged ones")
+    parser.add_argument("--no-autocrop", action="store_true", help="Keep letterbox/pillarbox bars instead of cropping them")
+    parser.add_argument("--no-storyboard", action="store_true", help="Don't build seek previews in the background")
+    parser.add_argument("--workers", type=int, help="Convert frames in N worker processes via shared memory (default: off)")
     parser.add_argument("--config", help="Path to YAML or JSON configuration file")
-    parser.add_argument("--export", choices=["text", "gif", "html"], help="Export mode")
+    parser.add_argument("--export", choices=["text", "gif", "html", "cast"], help="Export mode")
     parser.add_argument("--output", help="Output file path for export mode")
+    parser.add_argument("--append", action="store_true", help="Append to an existing text export archive")
     parser.add_argument("--frame-by-frame", action="store_true", help="Start in frame-by-frame mode")
+    parser.add_argument("--grid", metavar="COLSxROWS", help="Play all sources at once in a mosaic, e.g. 2x2")
+    parser.add_argument("--batch", metavar="DIR", help="Export every video in DIR to its own file")
+    parser.add_argument("--out-dir", metavar="DIR", help="Output directory for batch mode")
+    parser.add_argument("--jobs", type=int, help="Worker processes for batch mode (default: CPU count)")
     
     args = parser.parse_args()
+    if args.batch:
+        if not args.out_dir:
+            parser.error("--out-dir is required with --batch")
+    elif not args.sources:
+        parser.error("at least one source is required")
     
     config = Config(args)
-    player = VideoPlayer(config)
+    if args.batch:
+        from .batch import run_batch
+        ok = run_batch(args.batch, args.out_dir, args.export or "text", config.config, args.jobs)
+        sys.exit(0 if ok else 1)
+    elif args.export:
+        if not args.output:
+            print("Error: --output is required for export mode")
+            sys.exit(1)
+        if args.append and args.export != "text":
+            # only the frame archive can be extended; the others would be overwritten
+            print(f"Error: --append only works with --export text, not {args.export}", file=sys.stderr)
+            sys.exit(1)
+        run_export(args, config)
+    elif args.grid:
+        run_mosaic(args, config)
+    else:
+        run_playback(args, config)
+
+
+def download_options(config: Config) -> dict:
+    # only fetch the resolution and streams the render will actually use
+    return {
+        "target_width": config.get("target_width", 120),
+        "aspect_corr": config.get("aspect_corr", 0.45),
+        "audio": config.get("enable_audio", True),
+        "pixels_per_cell": 2 if config.get("charset") == "halfblock" else 1,
+    }
+
+
+def run_export(args, config: Config):
+    import cv2
     
+    from .exporter import AsciicastWriter, export_to_gif, export_to_html, export_to_text
+    from .frame_ring import FramePipeline
+    from .video_downloader import download_video
+    from .video_player import VideoPlayer
+    
+    player = VideoPlayer(config)
+    cast = None
     try:
-        # handle export mode
-        if args.export:
-            if not args.output:
-                print("Error: --output is required for export mode")
-                sys.exit(1)
+        frames = []
+        source_fps = None
+        for source in args.sources:
+            if source.startswith("http"):
+                # exports never need the audio stream
+                options = dict(download_options(config), audio=False)
+                video_path, temp_dir = download_video(source, **options)
+                player.temp_dir = temp_dir
+            else:
+                video_path = source
+                if not os.path.exists(video_path):
+                    print(f"Error: File not found: {video_path}")
+                    sys.exit(1)
             
-            frames = []
-            for source in args.sources:
-                if source.startswith("http"):
-                    video_path, temp_dir = download_video(source)
-                    player.temp_dir = temp_dir
-                else:
-                    video_path = source
-                    if not os.path.exists(video_path):
-                        print(f"Error: File not found: {video_path}")
-                        sys.exit(1)
-                
-                player.setup_video(video_path)
-                cap = cv2.VideoCapture(video_path)
-                
+            # exports never play sound, so skip audio extraction entirely
+            player.setup_video(video_path, load_audio=False)
+            cap = player.cap
+            source_fps = source_fps or cap.get(cv2.CAP_PROP_FPS)
+            if args.export == "cast" and cast is None:
+                # events go straight to disk as frames are converted, no frame list
+                cast = AsciicastWriter(args.output, source_fps or player.fps or 24)
+            emit = cast.write if cast is not None else frames.append
+            # setup_video gave the player a fresh detector, crop and converter
+            detector = player.change_detector
+            crop = player.autocrop
+            if crop:
+                # keep one geometry for the whole export, the startup probe decides it
+                crop.interval = 0
+            
+            if config.get("workers", 0) > 1:
+                # decoder fills shared-memory slots, workers convert them
+                pipeline = FramePipeline(
+                    cap, config.config, player.width, config.get("workers"), detector=detector, crop=crop
+                )
+                try:
+                    while True:
+                        item = pipeline.next()
+                        if item is None:
+                            break
+                        emit(item[1])
+                finally:
+                    pipeline.close()
+            else:
                 while True:
                     ok, frame = cap.read()
                     if not ok:
                         break
-                    ascii_frame = frame_to_ascii(
-                        frame,
-                        player.width,
-                        player.charset,
-                        config.get("invert", False),
-                        config.get("aspect_corr", 0.45),
-                        config.get("use_colors", True)
-                    )
-                    frames.append(ascii_frame)
-                
-                cap.release()
+                    emit(player.converter.convert(frame, player.width))  # None repeats the previous
             
-            if args.export == "text":
-                export_to_text(frames, args.output)
-            elif args.export == "gif":
-                export_to_gif(frames, args.output, player.fps or 24)
-            elif args.export == "html":
-                export_to_html(frames, args.output, player.fps or 24)
-            
-            player.cleanup()
-            return
+            cap.release()
+            if detector.skipped:
+                print(f"{source}: skipped {detector.skipped} duplicate frames")
+            if crop and crop.rect:
+                saved = crop.saved(
+                    player.compute_width(fit_rows=False, crop=False), player.width, config.get("aspect_corr", 0.45)
+                )
+                print(f"{source}: cropped to {crop.rect[2]}x{crop.rect[3]}, {saved:.0%} of cells saved")
+        
+        if args.export == "text":
+            export_to_text(frames, args.output, source_fps or player.fps or 24, append=args.append)
+        elif args.export == "gif":
+            export_to_gif(frames, args.output, player.fps or 24)
+        elif args.export == "html":
+            export_to_html(frames, args.output, player.fps or 24)
+        elif cast is not None:
+            cast.close()
+            print(f"Exported {len(cast)} frames to {args.output} ({cast.events} events)")
+    
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if cast is not None:
+            cast.close()
+        player.cleanup()
+
+
+def run_mosaic(args, config: Config):
+    from .mosaic import parse_grid, play_mosaic
+    from .video_downloader import download_video
+    
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    paths = []
+    temp_dirs = []
+    try:
+        for source in args.sources[:grid[0] * grid[1]]:
+            if source.startswith("http"):
+                # tiles are silent, so never fetch audio
+                options = dict(download_options(config), audio=False)
+                video_path, temp_dir = download_video(source, **options)
+                temp_dirs.append(temp_dir)
+            else:
+                video_path = source
+                if not os.path.exists(video_path):
+                    print(f"Error: File not found: {video_path}")
+                    sys.exit(1)
+            paths.append(video_path)
         
-        # playback mode
+        play_mosaic(paths, grid, config.config)
+    
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        for temp_dir in temp_dirs:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def run_playback(args, config: Config):
+    from .video_downloader import download_video
+    from .video_player import VideoPlayer
+    
+    player = VideoPlayer(config)
+    try:
         for i, source in enumerate(args.sources):
             if i > 0:
                 print(f"\n--- Playing {i+1}/{len(args.sources)}: {source} ---\n")
@@ -101,7 +263,7 @@ Examples:
             
             try:
                 if source.startswith("http"):
-                    video_path, temp_dir = download_video(source)
+                    video_path, temp_dir = download_video(source, **download_options(config))
                     player.temp_dir = temp_dir
                 else:
                     video_path = source
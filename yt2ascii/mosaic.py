@@ -0,0 +1,198 @@
+import multiprocessing as mp
+import queue
+import shutil
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import cv2
+
+from .ascii_converter import CropDetector, FrameConverter
+from .event_loop import EventLoop
+from .keyboard import KeyboardInput
+from .utils import clear_screen
+
+
+def parse_grid(value: str) -> Tuple[int, int]:
+    # "2x2" -> (columns, rows)
+    try:
+        cols, rows = (int(n) for n in value.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid grid {value!r}, expected COLSxROWS such as 2x2")
+    if cols < 1 or rows < 1:
+        raise ValueError(f"Invalid grid {value!r}, both dimensions must be at least 1")
+    return cols, rows
+
+
+def tile_geometry(grid: Tuple[int, int]) -> Tuple[int, int]:
+    # (tile width, tile rows) for the current terminal, leaving a one
+    # column gutter between tiles and the last line for the status
+    cols, rows = grid
+    term = shutil.get_terminal_size((120, 40))
+    tile_w = max(1, (term.columns - (cols - 1)) // cols)
+    tile_h = max(1, (term.lines - 1) // rows)
+    return tile_w, tile_h
+
+
+def _tile_worker(index: int, path: str, config: Dict[str, Any], start_time: float,
+                 tile_w, tile_h, generation, out_q, stop):
+    # decode and convert one source on the shared clock, dropping frames
+    # locally whenever it falls behind
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    full_w = cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 1
+    full_h = cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 1
+    src_w, src_h = full_w, full_h
+    crop = None
+    if config.get("autocrop", True):
+        # startup probe only, tile geometry stays fixed
+        crop = CropDetector(config.get("autocrop_limit", 24))
+        crop.probe(cap)
+        src_w, src_h = crop.content_size((full_w, full_h))
+    aspect_corr = config.get("aspect_corr", 0.45)
+    converter = FrameConverter(config, crop)
+
+    frame_idx = 0
+    dropped = 0
+    seen_generation = generation.value
+    try:
+        while not stop.is_set():
+            lag = time.time() - start_time - frame_idx / fps
+            if lag > 1.0 / fps:
+                # behind the shared clock: skip without converting
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                dropped += 1
+                continue
+            if lag < 0 and stop.wait(-lag):
+                break
+
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame_idx += 1
+
+            # widest tile-filling width whose height still fits the tile
+            width = min(tile_w.value, int(tile_h.value / (src_h / src_w * aspect_corr)))
+            if crop:
+                # and never more rows than the uncropped frame would take
+                full_width = min(tile_w.value, int(tile_h.value / (full_h / full_w * aspect_corr)))
+                width = min(width, crop.fit_width(max(1, full_width)))
+            width = max(1, width)
+            if generation.value != seen_generation:
+                # screen was cleared: the next frame must be drawn even if unchanged
+                seen_generation = generation.value
+                converter.detector.reset()
+            text = converter.convert(frame, width)
+            if text is None:
+                continue  # unchanged, the tile already shows it
+            out_q.put((index, width, text, dropped))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        out_q.put((index, None, None, dropped))
+
+
+def _draw_tile(index: int, grid: Tuple[int, int], tile_w: int, tile_h: int, width: int, text: str) -> str:
+    # position every line absolutely and pad the tile so stale cells from
+    # a wider or taller previous frame are overwritten
+    col0 = (index % grid[0]) * (tile_w + 1) + 1
+    row0 = (index // grid[0]) * tile_h + 1
+    pad = " " * max(0, tile_w - width)
+    lines = text.split("\n")[:tile_h]
+    parts = []
+    for k in range(tile_h):
+        parts.append(f"\x1b[{row0 + k};{col0}H")
+        if k < len(lines):
+            parts.append(lines[k])
+            parts.append("\x1b[0m")
+            parts.append(pad)
+        else:
+            parts.append(" " * tile_w)
+    return "".join(parts)
+
+
+def play_mosaic(paths: List[str], grid: Tuple[int, int], config: Dict[str, Any]):
+    tiles = grid[0] * grid[1]
+    if len(paths) > tiles:
+        print(f"Warning: {len(paths)} sources for {tiles} tiles, playing the first {tiles}", file=sys.stderr)
+        paths = paths[:tiles]
+
+    tile_w_now, tile_h_now = tile_geometry(grid)
+    # geometry is shared with the workers so a resize reaches them mid-stream
+    tile_w = mp.Value('i', tile_w_now)
+    tile_h = mp.Value('i', tile_h_now)
+    generation = mp.Value('i', 0)  # bumped whenever the screen is cleared
+    out_q = mp.Queue()
+    stop = mp.Event()
+    start_time = time.time()
+    workers = [
+        mp.Process(
+            target=_tile_worker,
+            args=(i, path, config, start_time, tile_w, tile_h, generation, out_q, stop),
+            daemon=True,
+        )
+        for i, path in enumerate(paths)
+    ]
+    for worker in workers:
+        worker.start()
+
+    tick = 1.0 / config.get("fps_cap", 24)
+    dropped = [0] * len(paths)
+    finished = set()
+    next_tick = time.time()
+    clear_screen()
+
+    with KeyboardInput() as kb, EventLoop(kb) as events:
+        try:
+            while len(finished) < len(paths):
+                quit_requested = False
+                for kind, value in events.wait(max(0.0, next_tick - time.time())):
+                    if kind == 'key' and value in ('Q', 'q'):
+                        quit_requested = True
+                    elif kind == 'resize':
+                        tile_w_now, tile_h_now = tile_geometry(grid)
+                        tile_w.value = tile_w_now
+                        tile_h.value = tile_h_now
+                        generation.value += 1
+                        clear_screen()
+                if quit_requested:
+                    break
+                if time.time() < next_tick:
+                    continue
+
+                # newest frame per tile wins; older ones are dropped here
+                latest = {}
+                while True:
+                    try:
+                        index, width, text, tile_dropped = out_q.get_nowait()
+                    except queue.Empty:
+                        break
+                    dropped[index] = tile_dropped
+                    if width is None:
+                        finished.add(index)
+                    elif width <= tile_w_now:
+                        latest[index] = (width, text)
+
+                if latest:
+                    out = [_draw_tile(i, grid, tile_w_now, tile_h_now, w, t) for i, (w, t) in latest.items()]
+                    status = f"Mosaic {grid[0]}x{grid[1]}  dropped: {' '.join(map(str, dropped))}  (q to quit)"
+                    out.append(f"\x1b[{grid[1] * tile_h_now + 1};1H{status}\x1b[K")
+                    sys.stdout.write("".join(out))
+                    sys.stdout.flush()
+
+                now = time.time()
+                next_tick += tick
+                if now - next_tick > tick:
+                    next_tick = now + tick
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
+            print(f"\nDone. Frames dropped per tile: {', '.join(map(str, dropped))}")
@@ -0,0 +1,154 @@
+import hashlib
+import multiprocessing as mp
+import os
+import queue
+from typing import Any, Dict, Optional
+
+import cv2
+
+from .ascii_converter import CropDetector, FrameConverter
+from .frame_archive import ArchiveReader, ArchiveWriter
+
+DEFAULT_STORYBOARD_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yt2ascii", "storyboards")
+
+# settings that change what a storyboard tile looks like
+_KEY_SETTINGS = ("storyboard_interval", "storyboard_width", "charset", "use_colors",
+                 "invert", "gamma", "contrast", "auto_levels", "auto_levels_interval",
+                 "aspect_corr", "autocrop", "autocrop_limit")
+
+
+def storyboard_path(video_path: str, config: Dict[str, Any]) -> str:
+    # cache file keyed by the video's identity and the rendering settings,
+    # so an edited video or a different charset never reuses stale tiles
+    st = os.stat(video_path)
+    key = repr((os.path.realpath(video_path), st.st_size, st.st_mtime_ns,
+                [config.get(k) for k in _KEY_SETTINGS]))
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".yt2a"
+    return os.path.join(config.get("storyboard_dir") or DEFAULT_STORYBOARD_DIR, name)
+
+
+def _build_worker(video_path: str, config: Dict[str, Any], out_path: Optional[str], results):
+    # sample one frame every interval seconds and convert it at low width;
+    # runs niced so playback always wins the CPU
+    try:
+        if hasattr(os, "nice"):
+            os.nice(19)
+        cv2.setNumThreads(1)
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        interval = config.get("storyboard_interval", 5)
+        width = config.get("storyboard_width", 40)
+        crop = None
+        if config.get("autocrop", True):
+            # same deterministic probe as the player, so tiles match playback
+            crop = CropDetector(config.get("autocrop_limit", 24))
+            crop.probe(cap)
+            width = crop.fit_width(width)
+        # tiles are seconds apart, every one of them is kept
+        converter = FrameConverter(dict(config, skip_duplicates=False), crop)
+
+        writer = None
+        if out_path:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            writer = ArchiveWriter(out_path + ".part", fps=1.0 / interval)
+        i = 0
+        try:
+            while True:
+                frame_pos = int(round(i * interval * fps))
+                if total and frame_pos >= total:
+                    break
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                text = converter.convert(frame, width)
+                results.put((i, text))
+                if writer is not None:
+                    writer.write(text)
+                i += 1
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        finally:
+            cap.release()
+        # only a complete storyboard is published under its final name
+        if writer is not None:
+            writer.close()
+            if i:
+                os.replace(out_path + ".part", out_path)
+    except (KeyboardInterrupt, Exception):
+        # the preview is optional: a failed build keeps the tiles sent so
+        # far and must never print a traceback over the playback screen
+        pass
+    finally:
+        results.put(None)
+
+
+class Storyboard:
+    # low-resolution previews sampled every `interval` seconds, filled in
+    # by a background process or loaded straight from the on-disk index
+
+    def __init__(self, video_path: str, config: Dict[str, Any], persist: bool = True):
+        self.interval = config.get("storyboard_interval", 5)
+        self.tiles: Dict[int, str] = {}
+        self.complete = False
+        self.process = None
+        self.results = None
+        self.part_path = None
+
+        path = storyboard_path(video_path, config) if persist else None
+        if path and os.path.exists(path):
+            try:
+                with ArchiveReader(path) as reader:
+                    for i in range(len(reader)):
+                        self.tiles[i] = reader.frame(i)
+                self.complete = True
+                return
+            except (OSError, ValueError):
+                self.tiles.clear()  # unreadable, rebuild it
+
+        if path:
+            self.part_path = path + ".part"
+        self.results = mp.Queue()
+        self.process = mp.Process(
+            target=_build_worker, args=(video_path, config, path, self.results), daemon=True
+        )
+        self.process.start()
+
+    def poll(self):
+        # collect whatever the builder has finished, never blocks
+        while not self.complete:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.complete = True
+            else:
+                self.tiles[item[0]] = item[1]
+
+    def preview(self, seconds: float) -> Optional[str]:
+        # nearest tile at or before the given time that is ready so far
+        self.poll()
+        i = int(seconds // self.interval)
+        while i >= 0:
+            if i in self.tiles:
+                return self.tiles[i]
+            i -= 1
+        return None
+
+    def close(self):
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(timeout=1)
+            self.process = None
+        # a finished build was already renamed; an interrupted one is useless
+        if self.part_path and os.path.exists(self.part_path):
+            try:
+                os.unlink(self.part_path)
+            except OSError:
+                pass
+        self.part_path = None
@@ -1,21 +1,83 @@
+import json
+import math
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 
+CONCURRENT_FRAGMENTS = 4
 
-def download_video(url: str, progress_callback: Optional[callable] = None) -> Tuple[str, str]:
+
+def required_source_width(target_width: int, aspect_corr: float = 0.45, pixels_per_cell: int = 1) -> int:
+    # narrowest source that still gives every output cell at least one
+    # pixel: width >= columns, and height >= rows * pixels_per_cell, where
+    # rows = height * columns / width * aspect_corr
+    return int(math.ceil(target_width * max(1.0, aspect_corr * pixels_per_cell)))
+
+
+def format_ladder(min_width: Optional[int], audio: bool) -> List[str]:
+    # smallest adequate format first (paired with -S width~N), then the old fallbacks
+    if audio:
+        formats = ["best[height<=360]/best", "best"]
+        if min_width:
+            formats.insert(0, f"bv*[width>={min_width}][fps<=30]+ba/b[width>={min_width}]/bv*+ba/b")
+        else:
+            formats.insert(0, "bestvideo[height<=360][fps<=30]+bestaudio/best/best")
+    else:
+        formats = ["bv*[height<=360]/b[height<=360]/bv*/b", "bv*/b"]
+        if min_width:
+            formats.insert(0, f"bv*[width>={min_width}][fps<=30]/b[width>={min_width}]/bv*/b")
+    return formats
+
+
+def _report_fetch(tdir: str, min_width: Optional[int]):
+    # compare what was downloaded against what the render needs
+    fetched = sum(
+        os.path.getsize(os.path.join(tdir, fn)) for fn in os.listdir(tdir)
+        if not fn.endswith(".info.json")
+    )
+    info = {}
+    for fn in os.listdir(tdir):
+        if fn.endswith(".info.json"):
+            try:
+                with open(os.path.join(tdir, fn), "r", encoding="utf-8") as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                pass
+            os.unlink(os.path.join(tdir, fn))
+    
+    line = f"\nFetched {fetched / 1e6:.1f} MB"
+    width, height = info.get("width"), info.get("height")
+    if width and height:
+        line += f" at {width}x{height}"
+        if min_width:
+            # bytes scale roughly with pixel count, so this estimates what an
+            # exactly-sized stream would have cost
+            needed = fetched * min(1.0, (min_width / width) ** 2)
+            line += f", render needs {min_width}px wide (~{needed / 1e6:.1f} MB)"
+    print(line)
+
+
+def download_video(
+    url: str,
+    progress_callback: Optional[callable] = None,
+    target_width: Optional[int] = None,
+    aspect_corr: float = 0.45,
+    audio: bool = True,
+    pixels_per_cell: int = 1
+) -> Tuple[str, str]:
     tdir = tempfile.mkdtemp(prefix="ascii_vid_")
     print(f"↓ Downloading to {tdir} ...")
     
+    min_width = required_source_width(target_width, aspect_corr, pixels_per_cell) if target_width else None
     # try multiple format options as fallback
-    format_options = [
-        "bestvideo[height<=360][fps<=30]+bestaudio/best/best",
-        "best[height<=360]/best",
-        "best"
-    ]
+    format_options = format_ladder(min_width, audio)
+    # closest width to what's needed wins; combined with the [width>=N]
+    # filter that is the smallest adequate stream, and if nothing is wide
+    # enough the fallbacks still land on the nearest one
+    sort_args = ["-S", f"width~{min_width},+size,+br"] if min_width else []
     
     stderr_output = []
     
@@ -24,23 +86,29 @@ def download_video(url: str, progress_callback: Optional[callable] = None) -> Tu
             "yt-dlp",
             "--no-playlist",
             "-f", fmt,
+            *sort_args,
+            "--concurrent-fragments", str(CONCURRENT_FRAGMENTS),
+            "--write-info-json",
+            "--newline",
             "-o", "%(title)s.%(ext)s",
             url
         ]
         
         try:
             # try to show progress
+            # progress goes to stdout and errors to stderr; merge them so
+            # neither pipe can fill up unread
             process = subprocess.Popen(
                 cmd,
                 cwd=tdir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
                 bufsize=1
             )
             
             stderr_lines = []
-            for line in process.stderr:
+            for line in process.stdout:
                 stderr_lines.append(line)
                 if progress_callback and "%" in line:
                     # extract progress if possible
@@ -55,6 +123,7 @@ def download_video(url: str, progress_callback: Optional[callable] = None) -> Tu
                 # success! find the downloaded file
                 for fn in os.listdir(tdir):
                     if fn.lower().endswith((".mp4", ".mkv", ".webm", ".mov")):
+                        _report_fetch(tdir, min_width)
                         return os.path.join(tdir, fn), tdir
                 raise RuntimeError("No video file found after download.")
             
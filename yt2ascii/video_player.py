@@ -3,26 +3,34 @@ import shutil
 import sys
 import time
 from collections import deque
-from typing import Optional
+from typing import Optional, Tuple
 
 import cv2
-import numpy as np
 
-from .ascii_converter import frame_to_ascii
+from .ascii_converter import ChangeDetector, CropDetector, FrameConverter
 from .audio_player import AudioPlayer
-from .charsets import CHARSETS
 from .config import Config
+from .event_loop import EventLoop
 from .frame_cache import FrameCache
+from .frame_ring import FramePipeline
 from .keyboard import KeyboardInput
+from .storyboard import Storyboard
 from .utils import clear_screen, format_time
 
+# terminals only report key repeats, never releases: a held arrow is
+# assumed released once no repeat arrives within this window (longer
+# before the first repeat, which waits out the autorepeat delay)
+SCRUB_RELEASE_FIRST = 0.6
+SCRUB_RELEASE_REPEAT = 0.15
+SEEK_STEP = 5  # seconds per arrow press
+
 
 class VideoPlayer:
     def __init__(self, config: Config):
         self.config = config
-        self.charset_str = CHARSETS.get(config.get("charset", "detailed"), CHARSETS["detailed"])
-        self.charset = np.array(list(self.charset_str))
         self.frame_cache = FrameCache(config.get("frame_cache_size", 100))
+        self.change_detector = ChangeDetector(config.get("duplicate_threshold", 1.0))
+        self.converter = None  # FrameConverter for the current video
         self.audio_player = AudioPlayer(config.get("enable_audio", True))
         self.paused = False
         self.quit = False
@@ -33,14 +41,21 @@ class VideoPlayer:
         self.temp_dir = None
         self.cap = None
         self.width = None
+        self.source_size = None  # (width, height) of the decoded video
         self.fps = None
         self.frame_delay = None
         self.start_time = None
         self.last_frame_time = None
         self.frame_times = deque(maxlen=30)  # For adaptive quality
         self.fullscreen = False
+        self.pipeline = None  # FramePipeline when converting in worker processes
+        self.storyboard = None
+        self.autocrop = None  # CropDetector when black bars are cropped
+        self.scrub_target = None  # frame the held arrow has scrubbed to
+        self.scrub_release = None  # time the scrub counts as released
+        self.status_row = None  # screen row of the status line, None after a clear
     
-    def setup_video(self, video_path: str):
+    def setup_video(self, video_path: str, load_audio: bool = True):
         self.video_path = video_path
         self.cap = cv2.VideoCapture(video_path)
         if not self.cap.isOpened():
@@ -50,15 +65,107 @@ class VideoPlayer:
         video_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
         self.fps = min(video_fps, self.config.get("fps_cap", 24))
         self.frame_delay = 1.0 / self.fps
+        self.source_size = (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+        
+        if self.config.get("autocrop", True):
+            self.autocrop = CropDetector(
+                self.config.get("autocrop_limit", 24), self.config.get("autocrop_interval", 120)
+            )
+            self.autocrop.probe(self.cap)
         
-        # setup width
-        term_width = shutil.get_terminal_size((self.config.get("target_width", 120), 40)).columns
-        self.width = min(self.config.get("target_width", 120), max(40, term_width))
+        self.width = self.compute_width(fit_rows=False)
+        self.change_detector = ChangeDetector(self.config.get("duplicate_threshold", 1.0))
+        self.converter = FrameConverter(self.config.config, self.autocrop, self.change_detector)
         
         # load audio
-        if self.config.get("enable_audio", True):
+        if load_audio and self.config.get("enable_audio", True):
             self.audio_player.load_audio(video_path)
     
+    def compute_width(self, fit_rows: bool = True, crop: bool = True) -> int:
+        # output width for the current terminal; with fit_rows the width is
+        # also reduced until the frame plus the status line fits vertically.
+        # A crop is then refit to the uncropped width, so it never takes more
+        # cells than the whole frame would (crop=False gives that width)
+        term = shutil.get_terminal_size((self.config.get("target_width", 120), 40))
+        if self.fullscreen:
+            width = term.columns
+        elif fit_rows:
+            width = min(self.config.get("target_width", 120), term.columns)
+        else:
+            width = min(self.config.get("target_width", 120), max(40, term.columns))
+        
+        if fit_rows and self.source_size and all(self.source_size):
+            src_w, src_h = self.source_size
+            rows_per_col = src_h / src_w * self.config.get("aspect_corr", 0.45)
+            max_rows = max(1, term.lines - 1)  # last line is the status line
+            if int(width * rows_per_col) > max_rows:
+                width = int(max_rows / rows_per_col)
+        width = max(1, width)
+        if crop and self.autocrop is not None:
+            # fewer rows and columns than the whole frame, so it fits too
+            width = self.autocrop.fit_width(width)
+        return width
+    
+    def handle_resize(self):
+        # terminal size changed, redraw from a clean screen at the new
+        # geometry; resize plans for sizes seen before are reused
+        self.width = self.compute_width()
+        self.change_detector.reset()
+        if self.pipeline:
+            self.pipeline.reset()
+        clear_screen()
+        self.status_row = None
+    
+    def playback_position(self) -> float:
+        # the decoder runs ahead of the screen when a pipeline is in use
+        if self.pipeline:
+            return self.current_frame
+        return self.cap.get(cv2.CAP_PROP_POS_FRAMES)
+    
+    def seek(self, frame_pos: float):
+        if self.pipeline:
+            self.pipeline.reset()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
+        self.change_detector.reset()
+    
+    def scrub(self, direction: int):
+        # move the scrub target one step and show its storyboard preview
+        # right away; the real seek waits until the key is released
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        now = time.time()
+        if self.scrub_target is None:
+            base = self.playback_position()
+            self.scrub_release = now + SCRUB_RELEASE_FIRST
+        else:
+            base = self.scrub_target
+            self.scrub_release = now + SCRUB_RELEASE_REPEAT
+        self.scrub_target = min(self.total_frames, max(0, base + direction * SEEK_STEP * fps))
+        
+        seconds = self.scrub_target / fps
+        preview = self.storyboard.preview(seconds)
+        status = f"Seek {format_time(seconds)} / {format_time(self.total_frames / fps)}"
+        if preview is None:
+            status += " (preview not ready)"
+        clear_screen()
+        if preview:
+            sys.stdout.write(preview)
+            sys.stdout.write("\n")
+        sys.stdout.write(f"{status}\x1b[K")
+        sys.stdout.flush()
+    
+    def finish_scrub(self):
+        target = self.scrub_target
+        self.scrub_target = None
+        self.scrub_release = None
+        self.seek(target)
+        clear_screen()
+        if self.paused:
+            # nothing else would replace the preview while paused
+            self.show_next_frame()
+    
     def handle_input(self, key: Optional[str]):
         if not key:
             return
@@ -71,71 +178,120 @@ class VideoPlayer:
                 self.audio_player.play()
         elif key == 'Q' or key == 'q':
             self.quit = True
+        elif key in ('LEFT', 'RIGHT') and self.cap and self.storyboard:
+            self.scrub(-1 if key == 'LEFT' else 1)
         elif key == 'LEFT':
             # seek backward 5 seconds
             if self.cap:
-                current_pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
+                current_pos = self.playback_position()
                 fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
-                new_pos = max(0, current_pos - 5 * fps)
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_pos)
-                self.frame_cache.clear()
+                new_pos = max(0, current_pos - SEEK_STEP * fps)
+                self.seek(new_pos)
         elif key == 'RIGHT':
             # seek forward 5 seconds
             if self.cap:
-                current_pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
+                current_pos = self.playback_position()
                 fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
-                new_pos = min(self.total_frames, current_pos + 5 * fps)
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_pos)
-                self.frame_cache.clear()
+                new_pos = min(self.total_frames, current_pos + SEEK_STEP * fps)
+                self.seek(new_pos)
         elif key == 'PLUS' or key == '=':
             self.speed = min(3.0, self.speed + 0.25)
         elif key == 'MINUS' or key == '-':
             self.speed = max(0.25, self.speed - 0.25)
         elif key == 'F' or key == 'f':
             self.fullscreen = not self.fullscreen
-            if self.fullscreen:
-                term_width = shutil.get_terminal_size().columns
-                self.width = term_width
-            else:
-                term_width = shutil.get_terminal_size().columns
-                self.width = min(self.config.get("target_width", 120), max(40, term_width))
-            self.frame_cache.clear()
+            self.handle_resize()
         elif key == 'ENTER':
             # frame-by-frame mode toggle (step one frame)
             if self.paused and self.cap:
-                ok, _ = self.cap.read()
-                if ok:
-                    self.current_frame += 1
+                if self.pipeline:
+                    if self.pipeline.next() is not None:
+                        self.current_frame += 1
+                else:
+                    ok, _ = self.cap.read()
+                    if ok:
+                        self.current_frame += 1
     
-    def get_frame_ascii(self, frame_num: int) -> str:
-        cached = self.frame_cache.get(frame_num)
-        if cached:
-            return cached
-        
-        # convert frame
-        if not self.cap:
-            return ""
-        
-        # save current position
-        saved_pos = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+    def next_ascii_frame(self) -> Tuple[bool, Optional[str], float]:
+        # (ok, ascii or None for an unchanged frame, position in seconds)
+        if self.pipeline:
+            self.pipeline.width = self.width
+            item = self.pipeline.next()
+            if item is None:
+                return False, None, 0.0
+            (self.current_frame, pos_msec), ascii_art = item
+            if self.pipeline.crop_changed:
+                # frames in flight still have the old crop; redraw from the next one
+                self.handle_resize()
+                return True, None, pos_msec / 1000.0
+            return True, ascii_art, pos_msec / 1000.0
+        
         ok, frame = self.cap.read()
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, saved_pos)
+        if not ok:
+            return False, None, 0.0
+        
+        self.current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        current_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
         
+        if self.autocrop and self.autocrop.update(frame):
+            # picture area grew (e.g. a wider scene), refit to it
+            self.handle_resize()
+        
+        # renders survive seeks, so jumping back replays without converting;
+        # keyed by everything that changes the picture
+        cache_key = (self.width, self.autocrop.rect if self.autocrop else None, self.current_frame)
+        cached = self.frame_cache.get(cache_key)
+        if cached is not None:
+            # the detector never saw this frame, so it can't vouch for the next one
+            self.change_detector.reset()
+            return True, cached, current_time
+        
+        ascii_art = self.converter.convert(frame, self.width)
+        if ascii_art is None:
+            return True, None, current_time
+        self.frame_cache.put(cache_key, ascii_art)
+        return True, ascii_art, current_time
+    
+    def show_next_frame(self) -> bool:
+        # read, convert and draw one frame; False at end of video
+        # (with a pipeline, the time measured is the wait for the workers)
+        frame_start = time.time()
+        ok, ascii_art, current_time = self.next_ascii_frame()
         if not ok:
-            return ""
-        
-        ascii_frame = frame_to_ascii(
-            frame,
-            self.width,
-            self.charset,
-            self.config.get("invert", False),
-            self.config.get("aspect_corr", 0.45),
-            self.config.get("use_colors", True)
-        )
+            return False
+        
+        total_time = (self.total_frames / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0))
+        progress = f"{format_time(current_time)} / {format_time(total_time)}"
+        speed_indicator = f"Speed: {self.speed:.2f}x" if self.speed != 1.0 else ""
+        status = f"{progress} {speed_indicator}".strip()
         
-        self.frame_cache.put(frame_num, ascii_frame)
-        return ascii_frame
+        # unchanged frame: the picture on screen is already right, only the
+        # status line below it moves on
+        if ascii_art is None:
+            if self.status_row:
+                sys.stdout.write(f"\x1b[{self.status_row};1H{status}\x1b[K")
+                sys.stdout.flush()
+            return True
+        
+        frame_time = time.time() - frame_start
+        self.frame_times.append(frame_time)
+        
+        # adaptive quality
+        if self.config.get("adaptive_quality", True) and len(self.frame_times) > 10:
+            avg_frame_time = sum(self.frame_times) / len(self.frame_times)
+            if avg_frame_time > self.frame_delay * 0.8:
+                # slow down if we're taking too long
+                self.fps = max(10, self.fps - 1)
+                self.frame_delay = 1.0 / self.fps
+        
+        # display
+        sys.stdout.write("\x1b[H")  # move cursor to top
+        sys.stdout.write(ascii_art)
+        # no trailing newline: on the terminal's last line it would scroll
+        sys.stdout.write(f"\n{status}\x1b[K")
+        sys.stdout.flush()
+        self.status_row = ascii_art.count("\n") + 2
+        return True
     
     def play(self):
         clear_screen()
@@ -143,82 +299,88 @@ class VideoPlayer:
         if self.config.get("enable_audio", True):
             self.audio_player.play()
         
+        if self.config.get("storyboard", True):
+            # downloads live in a temp dir, caching their storyboard is pointless
+            self.storyboard = Storyboard(self.video_path, self.config.config, persist=self.temp_dir is None)
+        
+        self.width = self.compute_width()
+        workers = self.config.get("workers", 0)
+        if workers > 1:
+            self.pipeline = FramePipeline(
+                self.cap, self.config.config, self.width, workers,
+                detector=self.change_detector, crop=self.autocrop
+            )
+        
         self.start_time = time.time()
         self.last_frame_time = time.time()
+        next_deadline = self.last_frame_time
         
-        with KeyboardInput() as kb:
+        with KeyboardInput() as kb, EventLoop(kb) as events:
             try:
                 while not self.quit:
-                    # handle input
-                    key = kb.get_key()
-                    self.handle_input(key)
+                    # sleep until the next frame is due or something happens;
+                    # while paused only input or a resize can wake us
+                    timeout = None if self.paused else max(0.0, next_deadline - time.time())
+                    if self.scrub_release is not None:
+                        release_in = max(0.0, self.scrub_release - time.time())
+                        timeout = release_in if timeout is None else min(timeout, release_in)
+                    for kind, value in events.wait(timeout):
+                        if kind == 'key':
+                            self.handle_input(value)
+                        elif kind == 'resize':
+                            self.handle_resize()
                     
                     if self.quit:
                         break
                     
-                    if self.paused:
-                        time.sleep(0.1)
+                    if self.scrub_release is not None:
+                        if time.time() < self.scrub_release:
+                            continue  # still scrubbing, hold playback
+                        self.finish_scrub()
+                        next_deadline = time.time()
+                    
+                    if self.paused or time.time() < next_deadline:
                         continue
                     
-                    # read frame
-                    ok, frame = self.cap.read()
-                    if not ok:
+                    if not self.show_next_frame():
                         break
                     
-                    self.current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-                    
-                    # convert to ASCII
-                    frame_start = time.time()
-                    ascii_art = frame_to_ascii(
-                        frame,
-                        self.width,
-                        self.charset,
-                        self.config.get("invert", False),
-                        self.config.get("aspect_corr", 0.45),
-                        self.config.get("use_colors", True)
-                    )
-                    frame_time = time.time() - frame_start
-                    self.frame_times.append(frame_time)
-                    
-                    # adaptive quality
-                    if self.config.get("adaptive_quality", True) and len(self.frame_times) > 10:
-                        avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-                        if avg_frame_time > self.frame_delay * 0.8:
-                            # slow down if we're taking too long
-                            self.fps = max(10, self.fps - 1)
-                            self.frame_delay = 1.0 / self.fps
-                    
-                    # display
-                    current_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-                    total_time = (self.total_frames / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0))
-                    progress = f"{format_time(current_time)} / {format_time(total_time)}"
-                    speed_indicator = f"Speed: {self.speed:.2f}x" if self.speed != 1.0 else ""
-                    status = f"{progress} {speed_indicator}".strip()
-                    
-                    sys.stdout.write("\x1b[H")  # move cursor to top
-                    sys.stdout.write(ascii_art)
-                    sys.stdout.write(f"\n{status}\n")
-                    sys.stdout.flush()
-                    
                     # frame timing
                     now = time.time()
-                    sleep_for = (self.frame_delay / self.speed) - (now - self.last_frame_time)
-                    if sleep_for > 0:
-                        time.sleep(sleep_for)
-                    self.last_frame_time = time.time()
+                    next_deadline += self.frame_delay / self.speed
+                    if now - next_deadline > self.frame_delay:
+                        # fell behind (or just resumed), resync instead of bursting
+                        next_deadline = now + self.frame_delay / self.speed
+                    self.last_frame_time = now
                     
             except KeyboardInterrupt:
                 pass
             finally:
                 self.audio_player.stop()
+                if self.pipeline:
+                    self.pipeline.close()
+                    self.pipeline = None
+                if self.storyboard:
+                    self.storyboard.close()
+                    self.storyboard = None
+                self.scrub_target = None
+                self.scrub_release = None
                 if self.cap:
                     self.cap.release()
-                print("\nDone.")
+                skipped = self.change_detector.skipped
+                summary = f"\nDone. Skipped {skipped} duplicate frames." if skipped else "\nDone."
+                if self.autocrop and self.autocrop.rect:
+                    saved = self.autocrop.saved(
+                        self.compute_width(crop=False), self.width, self.config.get("aspect_corr", 0.45)
+                    )
+                    summary += f" Autocrop saved {saved:.0%} of cells."
+                print(summary)
     
     def cleanup(self):
         if self.temp_dir and os.path.exists(self.temp_dir):
             try:
                 shutil.rmtree(self.temp_dir)
+                self.temp_dir = None
             except Exception as e:
                 print(f"Warning: Could not remove temp directory: {e}", file=sys.stderr)
 